@@ -277,6 +277,7 @@ class MultiAgentTradingBot:
         self.client = BinanceClient()
         self.risk_manager = RiskManager()
         self.execution_engine = ExecutionEngine(self.client, self.risk_manager)
+        global_state.execution_engine = self.execution_engine  # ✅ 供 API 服务关闭时释放连接池
         self.saver = DataSaver() # ✅ 初始化 Multi-Agent 数据保存器
         
         # 🧹 启动时清除历史实盘数据，只保留当前周期
@@ -1835,7 +1836,7 @@ class MultiAgentTradingBot:
                 global_state.add_agent_message("bull_agent", f"Stance: {bull_p.get('stance')} | Reason: {bull_summary}", level="success")
                 global_state.add_agent_message("bear_agent", f"Stance: {bear_p.get('stance')} | Reason: {bear_summary}", level="warning")
 
-                decision_payload = self.strategy_engine.make_decision(
+                decision_payload = await self.strategy_engine.make_decision_async(
                     market_context_text=market_context_text,
                     market_context_data=market_context_data,
                     reflection=reflection_text,
@@ -5319,8 +5320,10 @@ class MultiAgentTradingBot:
         self.config._config['binance']['api_secret'] = fresh_api_secret
         
         # Recreate client on mode switch to pick up latest credentials.
+        self.client.close()
         self.client = BinanceClient(api_key=fresh_api_key, api_secret=fresh_api_secret)
         self.execution_engine = ExecutionEngine(self.client, self.risk_manager)
+        global_state.execution_engine = self.execution_engine
         self.data_sync_agent = DataSyncAgent(self.client)
         try:
             acc_info = self.client.get_futures_account()
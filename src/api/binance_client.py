@@ -44,6 +44,15 @@ class BinanceClient:
         
         log.info(f"Binance client initialized (testnet: {self.testnet})")
     
+    def close(self):
+        """关闭底层 HTTP 会话，释放连接池"""
+        if self.client is None:
+            return
+        try:
+            self.client.close_connection()
+        except Exception as e:
+            log.warning(f"Failed to close Binance session: {e}")
+    
     def get_klines(self, symbol: str, interval: str, limit: int = 500, start_time: int = None) -> List[Dict]:
         """
         获取K线数据
@@ -396,6 +405,117 @@ class BinanceClient:
             log.error(f"Order failed: {e}")
             raise
     
+    def place_stop_loss_order(
+        self,
+        symbol: str,
+        side: str,
+        stop_price: float,
+        position_side: str = 'LONG'
+    ) -> Dict:
+        """
+        下止损单 (STOP_MARKET, closePosition)
+        
+        Args:
+            symbol: 交易对
+            side: 平仓方向 (多仓用 SELL，空仓用 BUY)
+            stop_price: 触发价格
+            position_side: 持仓方向 (LONG/SHORT)
+        """
+        try:
+            order = self.client.futures_create_order(
+                symbol=symbol,
+                side=side,
+                type='STOP_MARKET',
+                stopPrice=stop_price,
+                closePosition=True,
+                positionSide=position_side
+            )
+            log.info(f"Stop loss set: {stop_price} (positionSide={position_side})")
+            return order
+        except BinanceAPIException as e:
+            log.error(f"Failed to set stop loss: {e}")
+            raise
+    
+    def place_take_profit_order(
+        self,
+        symbol: str,
+        side: str,
+        stop_price: float,
+        position_side: str = 'LONG'
+    ) -> Dict:
+        """
+        下止盈单 (TAKE_PROFIT_MARKET, closePosition)
+        
+        Args:
+            symbol: 交易对
+            side: 平仓方向 (多仓用 SELL，空仓用 BUY)
+            stop_price: 触发价格
+            position_side: 持仓方向 (LONG/SHORT)
+        """
+        try:
+            order = self.client.futures_create_order(
+                symbol=symbol,
+                side=side,
+                type='TAKE_PROFIT_MARKET',
+                stopPrice=stop_price,
+                closePosition=True,
+                positionSide=position_side
+            )
+            log.info(f"Take profit set: {stop_price} (positionSide={position_side})")
+            return order
+        except BinanceAPIException as e:
+            log.error(f"Failed to set take profit: {e}")
+            raise
+    
+    def place_sl_tp_batch_order(
+        self,
+        symbol: str,
+        side: str,
+        stop_loss_price: Optional[float] = None,
+        take_profit_price: Optional[float] = None,
+        position_side: str = 'LONG'
+    ) -> List[Dict]:
+        """
+        在一个批量下单请求中提交止损/止盈单 (futures batchOrders)
+        
+        Args:
+            symbol: 交易对
+            side: 平仓方向 (多仓用 SELL，空仓用 BUY)
+            stop_loss_price: 止损触发价格
+            take_profit_price: 止盈触发价格
+            position_side: 持仓方向 (LONG/SHORT)
+            
+        Returns:
+            与提交顺序（先止损后止盈）一一对应的结果列表；
+            单笔被拒时对应元素为 {'code': ..., 'msg': ...}，不会抛出异常
+        """
+        # batchOrders 以 JSON 提交，参数值统一使用字符串
+        batch = [
+            {
+                'symbol': symbol,
+                'side': side,
+                'type': order_type,
+                'stopPrice': str(price),
+                'closePosition': 'true',
+                'positionSide': position_side,
+            }
+            for order_type, price in (
+                ('STOP_MARKET', stop_loss_price),
+                ('TAKE_PROFIT_MARKET', take_profit_price),
+            )
+            if price
+        ]
+        if not batch:
+            return []
+        
+        try:
+            results = self.client.futures_place_batch_order(batchOrders=batch)
+            log.info(f"SL/TP batch placed: SL={stop_loss_price} TP={take_profit_price} (positionSide={position_side})")
+            return results
+        except BinanceAPIException as e:
+            log.error(f"Failed to place SL/TP batch: {e}")
+            raise
+    
     def set_stop_loss_take_profit(
         self,
         symbol: str,
@@ -426,29 +546,11 @@ class BinanceClient:
             
             # 止损单
             if stop_loss_price:
-                sl_order = self.client.futures_create_order(
-                    symbol=symbol,
-                    side=side,
-                    type='STOP_MARKET',
-                    stopPrice=stop_loss_price,
-                    closePosition=True,
-                    positionSide=position_side  # 添加持仓方向
-                )
-                orders.append(sl_order)
-                log.info(f"Stop loss set: {stop_loss_price} (positionSide={position_side})")
+                orders.append(self.place_stop_loss_order(symbol, side, stop_loss_price, position_side))
             
             # 止盈单
             if take_profit_price:
-                tp_order = self.client.futures_create_order(
-                    symbol=symbol,
-                    side=side,
-                    type='TAKE_PROFIT_MARKET',
-                    stopPrice=take_profit_price,
-                    closePosition=True,
-                    positionSide=position_side  # 添加持仓方向
-                )
-                orders.append(tp_order)
-                log.info(f"Take profit set: {take_profit_price} (positionSide={position_side})")
+                orders.append(self.place_take_profit_order(symbol, side, take_profit_price, position_side))
             
             return orders
             
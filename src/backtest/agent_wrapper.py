@@ -412,7 +412,7 @@ class BacktestAgentRunner:
         
         # Call LLM engine
         try:
-            llm_result_dict = self.llm_engine.make_decision(
+            llm_result_dict = await self.llm_engine.make_decision_async(
                 market_context_text=context_text,
                 market_context_data=context_data,
                 reflection=None # TODO: Add Backtest Reflection Support
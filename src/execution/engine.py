@@ -1,19 +1,25 @@
 """
 执行指挥官 (The Executor) 模块
 """
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from src.api.binance_client import BinanceClient
 from src.risk.manager import RiskManager
 from src.utils.logger import log
 from src.utils.action_protocol import (
+    Action,
     normalize_action,
-    is_open_action,
-    is_close_action,
-    is_passive_action,
 )
 from datetime import datetime
+from functools import partial
+import asyncio
 import time
 
+# 开仓方向 -> (开仓方向, 平仓方向, 持仓方向, 日志标签)
+_OPEN_DIRECTIONS = {
+    'long': ('BUY', 'SELL', 'LONG', '开多仓'),
+    'short': ('SELL', 'BUY', 'SHORT', '开空仓'),
+}
+
 
 class ExecutionEngine:
     """
@@ -23,10 +29,33 @@ class ExecutionEngine:
     def __init__(self, binance_client: BinanceClient, risk_manager: RiskManager):
         self.client = binance_client
         self.risk_manager = risk_manager
+        # 已确认没有挂单（止损/止盈）的交易对；平仓时可跳过 cancel_all_orders。
+        # 进程启动时为空：未知状态一律先撤单。
+        self._clean_symbols: set = set()
+        
+        # action -> handler，所有 handler 使用统一的关键字参数签名
+        self._handlers = {
+            Action.OPEN_LONG.value: partial(self._open_position, direction='long'),
+            Action.OPEN_SHORT.value: partial(self._open_position, direction='short'),
+            Action.CLOSE_LONG.value: self._close_position,
+            Action.CLOSE_SHORT.value: self._close_position,
+            'close_position': self._close_position,
+            Action.WAIT.value: self._noop,
+            Action.HOLD.value: self._noop,
+            # Legacy partial position commands (matched on raw action)
+            'add_position': self._add_position,
+            'reduce_position': self._reduce_position,
+        }
         
         log.info("🚀 The Executor (Execution Engine) initialized")
     
-    def execute_decision(
+    def close(self):
+        """关闭下单使用的 Binance 连接池"""
+        close = getattr(self.client, 'close', None)
+        if callable(close):
+            close()
+    
+    async def execute_decision(
         self,
         decision: Dict,
         account_info: Dict,
@@ -62,48 +91,63 @@ class ExecutionEngine:
         decision['action'] = action
         symbol = decision['symbol']
         
+        # 同一决策的所有返回结果共用一个时间戳
+        timestamp = datetime.now().isoformat()
         result = {
             'success': False,
             'action': action,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'orders': [],
             'message': ''
         }
         
+        # Keep backward compatibility for legacy partial position commands.
+        if raw_action in ('add_position', 'reduce_position'):
+            handler = self._handlers[raw_action]
+        else:
+            handler = self._handlers.get(action)
+        
+        if handler is None:
+            result['message'] = f'未知操作: {action}'
+            log.error(result['message'])
+            return result
+        
         try:
-            # Keep backward compatibility for legacy partial position commands.
-            if raw_action in ('add_position', 'reduce_position'):
-                if raw_action == 'add_position':
-                    return self._add_position(decision, account_info, position_info, current_price)
-                return self._reduce_position(decision, position_info)
-
-            if is_passive_action(action):
-                result['success'] = True
-                result['message'] = '观望，不执行操作'
-                log.info(f"执行{action}，无操作")
-                return result
-            
-            elif is_open_action(action) and action == 'open_long':
-                return self._open_long(decision, account_info, current_price)
-            
-            elif is_open_action(action) and action == 'open_short':
-                return self._open_short(decision, account_info, current_price)
-            
-            elif is_close_action(action):
-                return self._close_position(decision, position_info, close_action=action)
-            
-            else:
-                result['message'] = f'未知操作: {action}'
-                log.error(result['message'])
-                return result
-                
+            return await handler(
+                decision=decision,
+                account_info=account_info,
+                position_info=position_info,
+                current_price=current_price,
+                action=action,
+                timestamp=timestamp
+            )
         except Exception as e:
             log.error(f"执行交易失败: {e}")
             result['message'] = f'执行失败: {str(e)}'
             return result
     
-    def _open_long(self, decision: Dict, account_info: Dict, current_price: float) -> Dict:
-        """开多仓"""
+    async def _noop(self, action: str, timestamp: str, **_) -> Dict:
+        """观望"""
+        log.info(f"执行{action}，无操作")
+        return {
+            'success': True,
+            'action': action,
+            'timestamp': timestamp,
+            'orders': [],
+            'message': '观望，不执行操作'
+        }
+    
+    async def _open_position(
+        self,
+        decision: Dict,
+        account_info: Dict,
+        current_price: float,
+        timestamp: str,
+        direction: str,
+        **_
+    ) -> Dict:
+        """开仓（direction: 'long' 开多 / 'short' 开空）"""
+        side, close_side, position_side, label = _OPEN_DIRECTIONS[direction]
         symbol = decision['symbol']
         
         # 计算开仓数量
@@ -116,7 +160,8 @@ class ExecutionEngine:
         
         # 设置杠杆
         try:
-            self.client.client.futures_change_leverage(
+            await self._run_blocking(
+                self.client.client.futures_change_leverage,
                 symbol=symbol,
                 leverage=decision['leverage']
             )
@@ -124,12 +169,13 @@ class ExecutionEngine:
         except Exception as e:
             log.executor(f"设置杠杆失败: {e}", success=False)
         
-        # 下市价买单（开多仓）
-        order = self.client.place_market_order(
+        # 下市价单（双向持仓模式下明确指定 LONG/SHORT）
+        order = await self._run_blocking(
+            self.client.place_market_order,
             symbol=symbol,
-            side='BUY',
+            side=side,
             quantity=quantity,
-            position_side='LONG'  # 双向持仓模式下明确指定为LONG
+            position_side=position_side
         )
         
         # 计算止损止盈价格
@@ -138,99 +184,112 @@ class ExecutionEngine:
         stop_loss_price = self.risk_manager.calculate_stop_loss_price(
             entry_price=entry_price,
             stop_loss_pct=decision['stop_loss_pct'],
-            side='LONG'
+            side=position_side
         )
         
         take_profit_price = self.risk_manager.calculate_take_profit_price(
             entry_price=entry_price,
             take_profit_pct=decision['take_profit_pct'],
-            side='LONG'
+            side=position_side
         )
         
         # 设置止损止盈
-        sl_tp_orders = self.client.set_stop_loss_take_profit(
+        sl_tp_orders, failed = await self._place_sl_tp_orders(
             symbol=symbol,
+            close_side=close_side,
             stop_loss_price=stop_loss_price,
             take_profit_price=take_profit_price,
-            position_side='LONG'  # 明确指定多仓
+            position_side=position_side
         )
         
-        log.executor(f"开多仓成功: {quantity} {symbol} @ {entry_price}")
-        
-        return {
+        result = {
             'success': True,
-            'action': 'open_long',
-            'timestamp': datetime.now().isoformat(),
+            'action': f'open_{direction}',
+            'timestamp': timestamp,
             'orders': [order] + sl_tp_orders,
             'entry_price': entry_price,
             'quantity': quantity,
             'stop_loss': stop_loss_price,
             'take_profit': take_profit_price,
-            'message': '开多仓成功'
+            'message': f'{label}成功'
         }
-    
-    def _open_short(self, decision: Dict, account_info: Dict, current_price: float) -> Dict:
-        """开空仓"""
-        symbol = decision['symbol']
         
-        quantity = self.risk_manager.calculate_position_size(
-            account_balance=account_info['available_balance'],
-            position_pct=decision['position_size_pct'],
-            leverage=decision['leverage'],
-            current_price=current_price
-        )
+        if failed:
+            # 开仓单已成交但保护单缺失：不能报告为成功，也不返回未挂上的价格
+            for key in failed:
+                result[key] = None
+            failed_labels = '/'.join('止损' if key == 'stop_loss' else '止盈' for key in failed)
+            result.update({
+                'success': False,
+                'sl_tp_failed': True,
+                'message': f'{label}已成交，但{failed_labels}单提交失败，持仓未受保护'
+            })
+            log.executor(f"{result['message']}: {quantity} {symbol} @ {entry_price}", success=False)
+            return result
+        
+        log.executor(f"{label}成功: {quantity} {symbol} @ {entry_price}")
+        return result
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        """在线程池中执行同步 Binance 调用，避免阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+
+    async def _place_sl_tp_orders(
+        self,
+        symbol: str,
+        close_side: str,
+        stop_loss_price: Optional[float],
+        take_profit_price: Optional[float],
+        position_side: str
+    ) -> Tuple[List[Dict], List[str]]:
+        """
+        提交止损/止盈单
+        
+        两单合并为一个批量下单请求（一次往返）；单笔被拒不影响另一单，
+        也不回滚已成交的开仓单。
+        
+        Returns:
+            (已提交的订单列表, 失败的字段名列表 'stop_loss' / 'take_profit')
+        """
+        self._clean_symbols.discard(symbol)
+        # 顺序与 place_sl_tp_batch_order 的提交顺序一致：先止损后止盈
+        legs = [
+            (key, label)
+            for key, label, price in (
+                ('stop_loss', '止损', stop_loss_price),
+                ('take_profit', '止盈', take_profit_price),
+            )
+            if price
+        ]
+        if not legs:
+            return [], []
         
-        # 设置杠杆
         try:
-            self.client.client.futures_change_leverage(
+            results = await self._run_blocking(
+                self.client.place_sl_tp_batch_order,
                 symbol=symbol,
-                leverage=decision['leverage']
+                side=close_side,
+                stop_loss_price=stop_loss_price,
+                take_profit_price=take_profit_price,
+                position_side=position_side
             )
         except Exception as e:
-            log.executor(f"设置杠杆失败: {e}", success=False)
-        
-        # 下市价卖单（开空仓）
-        order = self.client.place_market_order(
-            symbol=symbol,
-            side='SELL',
-            quantity=quantity,
-            position_side='SHORT'  # 双向持仓模式下明确指定为SHORT
-        )
-        
-        entry_price = float(order.get('avgPrice', current_price))
-        
-        stop_loss_price = self.risk_manager.calculate_stop_loss_price(
-            entry_price=entry_price,
-            stop_loss_pct=decision['stop_loss_pct'],
-            side='SHORT'
-        )
-        
-        take_profit_price = self.risk_manager.calculate_take_profit_price(
-            entry_price=entry_price,
-            take_profit_pct=decision['take_profit_pct'],
-            side='SHORT'
-        )
-        
-        sl_tp_orders = self.client.set_stop_loss_take_profit(
-            symbol=symbol,
-            stop_loss_price=stop_loss_price,
-            take_profit_price=take_profit_price,
-            position_side='SHORT'  # 明确指定空仓
-        )
-        
-        log.executor(f"开空仓成功: {quantity} {symbol} @ {entry_price}")
-        
-        return {
-            'success': True,
-            'action': 'open_short',
-            'timestamp': datetime.now().isoformat(),
-            'orders': [order] + sl_tp_orders,
-            'entry_price': entry_price,
-            'quantity': quantity,
-            'stop_loss': stop_loss_price,
-            'take_profit': take_profit_price,
-            'message': '开空仓成功'
-        }
+            log.executor(f"止损/止盈单提交失败 ({symbol}): {e!r}", success=False)
+            return [], [key for key, _ in legs]
+        
+        orders = []
+        failed = []
+        for (key, label), item in zip(legs, results):
+            # 批量接口逐笔返回：被拒的一笔为 {'code': <负数>, 'msg': ...}
+            if isinstance(item, dict) and 'orderId' in item:
+                orders.append(item)
+            else:
+                log.executor(f"{label}单提交失败 ({symbol}): {item!r}", success=False)
+                failed.append(key)
+        # 返回条数不足时，缺失的一笔同样视为失败
+        failed.extend(key for key, _ in legs[len(results):])
+        return orders, failed
 
     def set_stop_loss_take_profit(
         self,
@@ -240,6 +299,7 @@ class ExecutionEngine:
         take_profit: Optional[float] = None
     ) -> List[Dict]:
         """兼容主流程调用，转发到 BinanceClient。"""
+        self._clean_symbols.discard(symbol)
         return self.client.set_stop_loss_take_profit(
             symbol=symbol,
             stop_loss_price=stop_loss,
@@ -247,40 +307,44 @@ class ExecutionEngine:
             position_side=position_side
         )
     
-    def _close_position(
+    async def _close_position(
         self,
         decision: Dict,
         position_info: Optional[Dict],
-        close_action: str = "close_position",
+        timestamp: str,
+        action: str = "close_position",
+        **_
     ) -> Dict:
         """平仓"""
         if not position_info or position_info.get('position_amt', 0) == 0:
             return {
                 'success': False,
-                'action': close_action,
-                'timestamp': datetime.now().isoformat(),
+                'action': action,
+                'timestamp': timestamp,
                 'message': '无持仓，无需平仓'
             }
         
         symbol = decision['symbol']
         position_amt = position_info['position_amt']
-        if close_action == "close_long" and position_amt < 0:
+        if action == "close_long" and position_amt < 0:
             return {
                 'success': False,
-                'action': close_action,
-                'timestamp': datetime.now().isoformat(),
+                'action': action,
+                'timestamp': timestamp,
                 'message': '持仓方向不匹配: 当前为空仓'
             }
-        if close_action == "close_short" and position_amt > 0:
+        if action == "close_short" and position_amt > 0:
             return {
                 'success': False,
-                'action': close_action,
-                'timestamp': datetime.now().isoformat(),
+                'action': action,
+                'timestamp': timestamp,
                 'message': '持仓方向不匹配: 当前为多仓'
             }
         
-        # 取消所有挂单
-        self.client.cancel_all_orders(symbol)
+        # 取消所有挂单：仅在可能存在挂单时发起
+        if symbol not in self._clean_symbols:
+            await self._run_blocking(self.client.cancel_all_orders, symbol)
+            self._clean_symbols.add(symbol)
         
         # 平仓
         side = 'SELL' if position_amt > 0 else 'BUY'
@@ -288,7 +352,8 @@ class ExecutionEngine:
         
         log.executor(f"开始执行平仓: {side} {quantity} {symbol}")
         
-        order = self.client.place_market_order(
+        order = await self._run_blocking(
+            self.client.place_market_order,
             symbol=symbol,
             side=side,
             quantity=quantity,
@@ -299,42 +364,42 @@ class ExecutionEngine:
         
         return {
             'success': True,
-            'action': close_action,
-            'timestamp': datetime.now().isoformat(),
+            'action': action,
+            'timestamp': timestamp,
             'orders': [order],
             'quantity': quantity,
             'message': '平仓成功'
         }
     
-    def _add_position(
+    async def _add_position(
         self,
         decision: Dict,
         account_info: Dict,
         position_info: Optional[Dict],
-        current_price: float
+        current_price: float,
+        timestamp: str,
+        **_
     ) -> Dict:
         """加仓"""
         if not position_info or position_info.get('position_amt', 0) == 0:
             return {
                 'success': False,
                 'action': 'add_position',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp,
                 'message': '无持仓，无法加仓'
             }
         
         # 判断当前是多还是空
-        if position_info['position_amt'] > 0:
-            return self._open_long(decision, account_info, current_price)
-        else:
-            return self._open_short(decision, account_info, current_price)
+        direction = 'long' if position_info['position_amt'] > 0 else 'short'
+        return await self._open_position(decision, account_info, current_price, timestamp, direction)
     
-    def _reduce_position(self, decision: Dict, position_info: Optional[Dict]) -> Dict:
+    async def _reduce_position(self, decision: Dict, position_info: Optional[Dict], timestamp: str, **_) -> Dict:
         """减仓"""
         if not position_info or position_info.get('position_amt', 0) == 0:
             return {
                 'success': False,
                 'action': 'reduce_position',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp,
                 'message': '无持仓，无法减仓'
             }
         
@@ -345,7 +410,8 @@ class ExecutionEngine:
         reduce_qty = abs(position_amt) * 0.5
         side = 'SELL' if position_amt > 0 else 'BUY'
         
-        order = self.client.place_market_order(
+        order = await self._run_blocking(
+            self.client.place_market_order,
             symbol=symbol,
             side=side,
             quantity=reduce_qty,
@@ -357,7 +423,7 @@ class ExecutionEngine:
         return {
             'success': True,
             'action': 'reduce_position',
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'orders': [order],
             'quantity': reduce_qty,
             'message': '减仓成功'
@@ -6,14 +6,43 @@ LLM 抽象基类和配置
 """
 
 from abc import ABC, abstractmethod
+import importlib.util
 from dataclasses import dataclass, field
 from typing import Dict, Any, Optional, List
 import httpx
+import json
+import random
 import time
 
 from src.llm.metrics import record_error, record_request, record_success
 import re
 
+# 重试退避参数（秒）：指数退避 + 抖动，服务端给出 Retry-After 时以其为准
+RETRY_BACKOFF_INITIAL = 0.5
+RETRY_BACKOFF_MAX = 8.0
+RETRY_AFTER_MAX = 60.0
+
+# 连接池：跨请求复用 TCP/TLS 连接，省去每次调用的握手延迟
+HTTP_MAX_KEEPALIVE = 10
+HTTP_KEEPALIVE_EXPIRY = 60.0
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_POOL_TIMEOUT = 5.0
+# 安装了 h2 时启用 HTTP/2（单连接多路复用）
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """计算第 attempt 次失败后的等待时间"""
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), RETRY_AFTER_MAX)
+            except ValueError:
+                pass  # HTTP-date 格式，退回指数退避
+    delay = min(RETRY_BACKOFF_INITIAL * (2 ** attempt), RETRY_BACKOFF_MAX)
+    return delay + random.uniform(0, delay / 2)
+
 
 @dataclass
 class LLMConfig:
@@ -55,10 +84,15 @@ class BaseLLMClient(ABC):
     所有 LLM 提供商客户端必须继承此类并实现抽象方法。
     """
     
+    # 实例属性固定，使用 __slots__ 省去每个实例的 __dict__（子类需声明 __slots__ = ()）
+    __slots__ = ("config", "base_url", "model", "client")
+    
     # 子类需要覆盖的默认值
     DEFAULT_BASE_URL: str = ""
     DEFAULT_MODEL: str = ""
     PROVIDER: str = "base"
+    # 是否支持 SSE 流式输出（需实现 _parse_stream_delta）
+    SUPPORTS_STREAMING: bool = False
     
     def __init__(self, config: LLMConfig):
         """
@@ -70,7 +104,18 @@ class BaseLLMClient(ABC):
         self.config = config
         self.base_url = config.base_url or self.DEFAULT_BASE_URL
         self.model = config.model or self.DEFAULT_MODEL
-        self.client = httpx.Client(timeout=config.timeout)
+        self.client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                config.timeout,
+                connect=HTTP_CONNECT_TIMEOUT,
+                pool=HTTP_POOL_TIMEOUT,
+            ),
+        )
     
     @abstractmethod
     def _build_headers(self) -> Dict[str, str]:
@@ -95,6 +140,10 @@ class BaseLLMClient(ABC):
         """构建请求 URL"""
         return f"{self.base_url}/chat/completions"
     
+    def _parse_stream_delta(self, event: Dict[str, Any]) -> str:
+        """从一条流式事件中提取增量文本（SUPPORTS_STREAMING 的子类覆盖，默认无内容）"""
+        return ""
+    
     def _messages_to_list(self, messages: List[ChatMessage]) -> List[Dict[str, str]]:
         """将 ChatMessage 列表转换为字典列表"""
         return [{"role": m.role, "content": m.content} for m in messages]
@@ -125,7 +174,7 @@ class BaseLLMClient(ABC):
         Args:
             system_prompt: 系统提示词
             user_prompt: 用户提示词
-            **kwargs: 额外参数（temperature, max_tokens 等）
+            **kwargs: 额外参数（temperature, max_tokens, stop_after 等）
             
         Returns:
             LLMResponse 对象
@@ -139,6 +188,7 @@ class BaseLLMClient(ABC):
     def chat_messages(
         self, 
         messages: List[ChatMessage],
+        stop_after: Optional[str] = None,
         **kwargs
     ) -> LLMResponse:
         """
@@ -146,6 +196,8 @@ class BaseLLMClient(ABC):
         
         Args:
             messages: 消息列表
+            stop_after: 可选的结束标记；提供商支持流式时以流式接收，
+                        收到该标记后立即断开连接，不再等待剩余 token
             **kwargs: 额外参数
             
         Returns:
@@ -154,16 +206,22 @@ class BaseLLMClient(ABC):
         url = self._build_url()
         headers = self._build_headers()
         body = self._build_request_body(messages, **kwargs)
+        streaming = bool(stop_after) and self.SUPPORTS_STREAMING
+        if streaming:
+            body["stream"] = True
         
         last_error = None
         for attempt in range(self.config.max_retries):
             try:
                 record_request(self.PROVIDER, self.model)
                 est_prompt_tokens = self._estimate_prompt_tokens(messages)
-                start_ts = time.time()
-                response = self.client.post(url, json=body, headers=headers)
-                response.raise_for_status()
-                parsed = self._parse_response(response.json())
+                start_ns = time.perf_counter_ns()
+                if streaming:
+                    parsed = self._send_streaming(url, headers, body, stop_after)
+                else:
+                    response = self.client.post(url, json=body, headers=headers)
+                    response.raise_for_status()
+                    parsed = self._parse_response(response.json())
                 usage = parsed.usage or {}
                 prompt_tokens = int(usage.get("prompt_tokens", 0) or 0)
                 completion_tokens = int(usage.get("completion_tokens", 0) or 0)
@@ -179,16 +237,16 @@ class BaseLLMClient(ABC):
                         "completion_tokens": completion_tokens,
                         "total_tokens": total_tokens
                     }
-                latency_ms = int((time.time() - start_ts) * 1000)
+                latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
                 record_success(self.PROVIDER, self.model, latency_ms, parsed.usage)
                 return parsed
             except httpx.HTTPStatusError as e:
                 last_error = e
                 record_error(self.PROVIDER, self.model, f"HTTP {e.response.status_code}")
-                if e.response.status_code in [429, 500, 502, 503, 504]:
+                if e.response.status_code in [429, 500, 502, 503, 504] and attempt < self.config.max_retries - 1:
                     # 可重试的 HTTP 错误
-                    wait_time = 2 ** attempt
-                    print(f"⚠️ LLM HTTP Error {e.response.status_code}, retrying in {wait_time}s (attempt {attempt + 1}/{self.config.max_retries})")
+                    wait_time = _retry_delay(attempt, e.response)
+                    print(f"⚠️ LLM HTTP Error {e.response.status_code}, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{self.config.max_retries})")
                     time.sleep(wait_time)
                     continue
                 raise
@@ -197,8 +255,10 @@ class BaseLLMClient(ABC):
                 # 网络连接错误，需要重试
                 last_error = e
                 record_error(self.PROVIDER, self.model, type(e).__name__)
-                wait_time = 2 ** attempt
-                print(f"⚠️ LLM Connection Error: {type(e).__name__}, retrying in {wait_time}s (attempt {attempt + 1}/{self.config.max_retries})")
+                if attempt >= self.config.max_retries - 1:
+                    break
+                wait_time = _retry_delay(attempt)
+                print(f"⚠️ LLM Connection Error: {type(e).__name__}, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{self.config.max_retries})")
                 time.sleep(wait_time)
                 continue
             except Exception as e:
@@ -206,14 +266,50 @@ class BaseLLMClient(ABC):
                 record_error(self.PROVIDER, self.model, type(e).__name__)
                 # 其他未知错误，最后一次尝试后抛出
                 if attempt < self.config.max_retries - 1:
-                    wait_time = 2 ** attempt
-                    print(f"⚠️ LLM Unexpected Error: {type(e).__name__}: {e}, retrying in {wait_time}s")
+                    wait_time = _retry_delay(attempt)
+                    print(f"⚠️ LLM Unexpected Error: {type(e).__name__}: {e}, retrying in {wait_time:.1f}s")
                     time.sleep(wait_time)
                     continue
                 raise
         
         raise last_error or Exception("Max retries exceeded")
 
+    def _send_streaming(self, url: str, headers: Dict[str, str], body: Dict[str, Any], stop_after: str) -> LLMResponse:
+        """
+        以 SSE 流式接收响应，出现 stop_after 标记后立即返回
+        
+        提前关闭响应，让服务端停止生成（不再为剩余 token 计费）；
+        HTTP/1.1 下该连接随之丢弃，HTTP/2 下只关闭这一条流。
+        """
+        parts: List[str] = []
+        tail = ""
+        request = self.client.build_request("POST", url, json=body, headers=headers)
+        response = self.client.send(request, stream=True)
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                delta = self._parse_stream_delta(json.loads(data))
+                if not delta:
+                    continue
+                parts.append(delta)
+                # 标记可能跨两个增量，只需检查上一段尾部 + 本段
+                window = tail + delta
+                if stop_after in window:
+                    break
+                tail = window[-len(stop_after):]
+        finally:
+            response.close()
+        # 流式响应不带 usage，由 chat_messages 估算
+        return LLMResponse(
+            content="".join(parts),
+            model=self.model,
+            provider=self.PROVIDER
+        )
     
     def close(self):
         """关闭 HTTP 客户端"""
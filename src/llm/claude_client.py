@@ -18,6 +18,8 @@ class ClaudeClient(BaseLLMClient):
     - 端点是 /messages 而非 /chat/completions
     - system prompt 是独立字段
     """
+
+    __slots__ = ()
     
     DEFAULT_BASE_URL = "https://api.anthropic.com/v1"
     DEFAULT_MODEL = "claude-3-5-sonnet-20241022"
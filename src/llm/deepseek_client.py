@@ -14,6 +14,8 @@ class DeepSeekClient(OpenAIClient):
     
     继承 OpenAI 客户端，使用 OpenAI 兼容 API。
     """
+
+    __slots__ = ()
     
     DEFAULT_BASE_URL = "https://api.deepseek.com"
     DEFAULT_MODEL = "deepseek-chat"
@@ -18,6 +18,8 @@ class GeminiClient(BaseLLMClient):
     - 消息格式使用 parts 而非 content
     - 端点结构不同
     """
+
+    __slots__ = ()
     
     DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
     DEFAULT_MODEL = "gemini-1.5-flash"
@@ -15,6 +15,8 @@ class GLMClient(OpenAIClient):
     使用智谱开放平台的 OpenAI 兼容接口。
     """
 
+    __slots__ = ()
+
     DEFAULT_BASE_URL = "https://open.bigmodel.cn/api/paas/v4"
     DEFAULT_MODEL = "glm-4-flash"
     PROVIDER = "glm"
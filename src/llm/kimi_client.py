@@ -15,6 +15,8 @@ class KimiClient(OpenAIClient):
     使用 Moonshot 平台的 OpenAI 兼容接口。
     """
 
+    __slots__ = ()
+
     DEFAULT_BASE_URL = "https://api.moonshot.ai/v1"
     DEFAULT_MODEL = "moonshot-v1-8k"
     PROVIDER = "kimi"
@@ -1,5 +1,8 @@
-from dataclasses import dataclass, asdict
+import asyncio
+from collections import deque
+from dataclasses import dataclass
 from threading import Lock
+from time import time as _time
 from typing import Dict, Any
 
 
@@ -18,23 +21,34 @@ class LLMStats:
     total_input_tokens: int = 0
     total_output_tokens: int = 0
     total_tokens: int = 0
+    # Derived fields, maintained by record_success so to_dict stays cheap
+    avg_latency_ms: int = 0
+    token_speed_tps: float = 0.0
 
     def to_dict(self) -> Dict[str, Any]:
-        avg_latency_ms = 0
-        if self.total_success > 0:
-            avg_latency_ms = int(self.total_latency_ms / self.total_success)
-        token_speed_tps = 0.0
-        if self.total_latency_ms > 0 and self.total_tokens > 0:
-            token_speed_tps = self.total_tokens / (self.total_latency_ms / 1000.0)
-        data = asdict(self)
-        data.update({
-            "avg_latency_ms": avg_latency_ms,
-            "token_speed_tps": round(token_speed_tps, 2)
-        })
-        return data
-
-
-_lock = Lock()
+        return {
+            "total_requests": self.total_requests,
+            "total_success": self.total_success,
+            "total_errors": self.total_errors,
+            "last_latency_ms": self.last_latency_ms,
+            "total_latency_ms": self.total_latency_ms,
+            "min_latency_ms": self.min_latency_ms,
+            "max_latency_ms": self.max_latency_ms,
+            "last_error": self.last_error,
+            "last_request_ts": self.last_request_ts,
+            "last_success_ts": self.last_success_ts,
+            "total_input_tokens": self.total_input_tokens,
+            "total_output_tokens": self.total_output_tokens,
+            "total_tokens": self.total_tokens,
+            "avg_latency_ms": self.avg_latency_ms,
+            "token_speed_tps": round(self.token_speed_tps, 2),
+        }
+
+
+# Stats are only written by drain(), which holds _drain_lock, so entries need
+# no locks of their own. _registry_lock only keeps key insertion from racing
+# snapshot() while it copies the maps.
+_registry_lock = Lock()
 _stats_by_provider: Dict[str, LLMStats] = {}
 _stats_by_model: Dict[str, LLMStats] = {}
 
@@ -43,54 +57,111 @@ def _get_or_create(map_ref: Dict[str, LLMStats], key: str) -> LLMStats:
     stat = map_ref.get(key)
     if stat is None:
         stat = LLMStats()
-        map_ref[key] = stat
+        with _registry_lock:
+            map_ref[key] = stat
     return stat
 
 
+# record_* only append to this queue (deque.append is thread-safe), so LLM
+# calls never wait on a metrics lock. Events are folded into LLMStats by
+# drain(): periodically from the dashboard, before every snapshot, and inline
+# once the backlog reaches _DRAIN_THRESHOLD (e.g. headless mode).
+_pending: deque = deque()
+_drain_lock = Lock()
+_DRAIN_THRESHOLD = 256
+DRAIN_INTERVAL_SEC = 0.1
+
+_REQUEST, _SUCCESS, _ERROR = 0, 1, 2
+
+
+def _enqueue(event: tuple):
+    _pending.append(event)
+    if len(_pending) >= _DRAIN_THRESHOLD:
+        drain(block=False)
+
+
 def record_request(provider: str, model: str):
-    with _lock:
-        for key, store in ((provider, _stats_by_provider), (model, _stats_by_model)):
-            stat = _get_or_create(store, key)
-            stat.total_requests += 1
-            stat.last_request_ts = __import__("time").time()
+    _enqueue((_REQUEST, provider, model, _time()))
 
 
 def record_success(provider: str, model: str, latency_ms: int, usage: Dict[str, Any] = None):
-    with _lock:
-        for key, store in ((provider, _stats_by_provider), (model, _stats_by_model)):
-            stat = _get_or_create(store, key)
-            stat.total_success += 1
-            stat.last_latency_ms = int(latency_ms)
-            stat.last_success_ts = __import__("time").time()
-            stat.last_error = ""
-            stat.total_latency_ms += int(latency_ms)
-            if stat.min_latency_ms == 0 or latency_ms < stat.min_latency_ms:
-                stat.min_latency_ms = int(latency_ms)
-            if latency_ms > stat.max_latency_ms:
-                stat.max_latency_ms = int(latency_ms)
-
-            usage = usage or {}
-            prompt_tokens = int(usage.get("prompt_tokens", 0) or 0)
-            completion_tokens = int(usage.get("completion_tokens", 0) or 0)
-            total_tokens = int(usage.get("total_tokens", 0) or 0)
-            if total_tokens <= 0:
-                total_tokens = prompt_tokens + completion_tokens
-            stat.total_input_tokens += prompt_tokens
-            stat.total_output_tokens += completion_tokens
-            stat.total_tokens += total_tokens
+    usage = usage or {}
+    prompt_tokens = int(usage.get("prompt_tokens", 0) or 0)
+    completion_tokens = int(usage.get("completion_tokens", 0) or 0)
+    total_tokens = int(usage.get("total_tokens", 0) or 0)
+    if total_tokens <= 0:
+        total_tokens = prompt_tokens + completion_tokens
+    _enqueue((_SUCCESS, provider, model, _time(), latency_ms, prompt_tokens, completion_tokens, total_tokens))
 
 
 def record_error(provider: str, model: str, error: str):
-    with _lock:
-        for key, store in ((provider, _stats_by_provider), (model, _stats_by_model)):
-            stat = _get_or_create(store, key)
-            stat.total_errors += 1
-            stat.last_error = error
+    _enqueue((_ERROR, provider, model, error))
+
+
+def _apply(stat: LLMStats, event: tuple):
+    kind = event[0]
+    if kind == _REQUEST:
+        stat.total_requests += 1
+        stat.last_request_ts = event[3]
+    elif kind == _SUCCESS:
+        _, _, _, ts, latency_ms, prompt_tokens, completion_tokens, total_tokens = event
+        stat.total_success += 1
+        stat.last_latency_ms = latency_ms
+        stat.last_success_ts = ts
+        stat.last_error = ""
+        stat.total_latency_ms += latency_ms
+        if stat.min_latency_ms == 0 or latency_ms < stat.min_latency_ms:
+            stat.min_latency_ms = latency_ms
+        if latency_ms > stat.max_latency_ms:
+            stat.max_latency_ms = latency_ms
+
+        stat.total_input_tokens += prompt_tokens
+        stat.total_output_tokens += completion_tokens
+        stat.total_tokens += total_tokens
+
+        stat.avg_latency_ms = stat.total_latency_ms // stat.total_success
+        if stat.total_latency_ms > 0 and stat.total_tokens > 0:
+            stat.token_speed_tps = stat.total_tokens * 1000.0 / stat.total_latency_ms
+    else:
+        stat.total_errors += 1
+        stat.last_error = event[3]
+
+
+def drain(block: bool = True) -> int:
+    """Fold queued events into the provider and model stats; returns the number applied."""
+    if not _drain_lock.acquire(blocking=block):
+        return 0
+    applied = 0
+    try:
+        while True:
+            try:
+                event = _pending.popleft()
+            except IndexError:
+                break
+            _apply(_get_or_create(_stats_by_provider, event[1]), event)
+            _apply(_get_or_create(_stats_by_model, event[2]), event)
+            applied += 1
+    finally:
+        _drain_lock.release()
+    return applied
+
+
+async def drain_periodically(interval: float = DRAIN_INTERVAL_SEC):
+    """Background task body: keep the queue short while the dashboard runs."""
+    while True:
+        drain()
+        await asyncio.sleep(interval)
 
 
 def snapshot() -> Dict[str, Any]:
-    with _lock:
-        return {
-            "providers": {k: v.to_dict() for k, v in _stats_by_provider.items()},
-            "models": {k: v.to_dict() for k, v in _stats_by_model.items()},
-        }
+    drain()
+    # Copy the key lists under the registry lock only, then serialize without
+    # holding any lock. A concurrent drain can at worst make one entry reflect a
+    # half-applied event, which is fine for a dashboard view.
+    with _registry_lock:
+        provider_items = list(_stats_by_provider.items())
+        model_items = list(_stats_by_model.items())
+    return {
+        "providers": {key: stat.to_dict() for key, stat in provider_items},
+        "models": {key: stat.to_dict() for key, stat in model_items},
+    }
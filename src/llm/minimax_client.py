@@ -15,6 +15,8 @@ class MiniMaxClient(OpenAIClient):
     使用 MiniMax 平台的 OpenAI 兼容接口。
     """
 
+    __slots__ = ()
+
     DEFAULT_BASE_URL = "https://api.minimax.io/v1"
     DEFAULT_MODEL = "MiniMax-M2.1"
     PROVIDER = "minimax"
@@ -15,10 +15,13 @@ class OpenAIClient(BaseLLMClient):
     
     也可作为兼容 OpenAI API 的其他提供商的基类。
     """
+
+    __slots__ = ()
     
     DEFAULT_BASE_URL = "https://api.openai.com/v1"
     DEFAULT_MODEL = "gpt-4o"
     PROVIDER = "openai"
+    SUPPORTS_STREAMING = True
     
     def _build_headers(self) -> Dict[str, str]:
         """构建 OpenAI 认证头"""
@@ -52,3 +55,8 @@ class OpenAIClient(BaseLLMClient):
             usage=response.get("usage", {}),
             raw_response=response
         )
+    
+    def _parse_stream_delta(self, event: Dict[str, Any]) -> str:
+        """解析 OpenAI 流式增量"""
+        choices = event.get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content") or ""
@@ -14,6 +14,8 @@ class QwenClient(OpenAIClient):
     
     使用阿里云 DashScope 的 OpenAI 兼容模式。
     """
+
+    __slots__ = ()
     
     DEFAULT_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
     DEFAULT_MODEL = "qwen-turbo"
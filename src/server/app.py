@@ -1,14 +1,21 @@
 from fastapi import FastAPI, Body, HTTPException, Request, Response, Depends, Cookie
 from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import QueryParams
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import os
 import secrets
 import json
 import inspect
+import asyncio
+import orjson
 from typing import Optional, Dict, List, Any
 from dataclasses import asdict
 from pathlib import Path
+from contextlib import asynccontextmanager
+from collections import deque
+from itertools import islice
 import yaml
 
 from src.server.state import global_state
@@ -27,7 +34,22 @@ class LoginRequest(BaseModel):
 from fastapi import UploadFile, File
 import shutil
 
-app = FastAPI(title="LLM-TradeBot Dashboard")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Dashboard startup/shutdown hooks"""
+    from src.llm.metrics import drain_periodically
+    # Fold queued LLM metric events into the stats in the background
+    metrics_drain = asyncio.create_task(drain_periodically())
+    try:
+        yield
+    finally:
+        metrics_drain.cancel()
+        # Release the Binance keep-alive pool held by the runtime ExecutionEngine
+        engine = getattr(global_state, 'execution_engine', None)
+        if engine is not None:
+            engine.close()
+
+app = FastAPI(title="LLM-TradeBot Dashboard", lifespan=lifespan)
 
 # Enable CORS (rest unchanged)
 app.add_middleware(
@@ -38,6 +60,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# NDJSON streams must reach the browser chunk by chunk; gzip would buffer them.
+UNCOMPRESSED_PATH_PREFIXES = ("/api/backtest/run", "/api/backtest/subscribe/")
+
+class DashboardGZipMiddleware(GZipMiddleware):
+    """GZip JSON/static responses (e.g. the /api/status poll), skipping streaming endpoints"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(UNCOMPRESSED_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+app.add_middleware(DashboardGZipMiddleware, minimum_size=1024, compresslevel=4)
+
 # Get absolute path to the web directory
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 WEB_DIR = os.path.join(BASE_DIR, 'web')
@@ -67,18 +103,25 @@ def verify_admin(role: str = Depends(verify_auth)):
         raise HTTPException(status_code=403, detail="User mode: No permission to perform this action.")
     return True
 
-import math
+def _json_default(obj):
+    """orjson fallback: state containers (deques, sets) become lists like jsonable_encoder did"""
+    if isinstance(obj, (deque, set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dump_json(obj) -> bytes:
+    """Serialize to JSON bytes in C; orjson emits NaN/Inf as null for JSON compliance"""
+    return orjson.dumps(
+        obj,
+        default=_json_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
 
-def clean_nans(obj):
-    """Recursively replace NaN/Inf with None for JSON compliance"""
-    if isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return None
-    elif isinstance(obj, dict):
-        return {k: clean_nans(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [clean_nans(i) for i in obj]
-    return obj
+# /api/status response cache: serialized bytes reused while the state version
+# (global_state.last_update) is unchanged, bounded by a short TTL so logs and
+# account data never lag more than STATUS_CACHE_TTL_SEC behind.
+STATUS_CACHE_TTL_SEC = 0.5
+_status_cache = {"version": None, "expires_at": 0.0, "payload": None}
 
 # Public endpoint for system info (no auth required)
 @app.get("/api/info")
@@ -169,8 +212,6 @@ async def get_status(authenticated: bool = Depends(verify_auth)):
         except Exception:
             return ['5m', '15m', '1h']
 
-    timeframes = _get_strategy_timeframes()
-    
     # Check and update demo expiration status
     if global_state.demo_mode_active and global_state.demo_start_time:
         elapsed = time.time() - global_state.demo_start_time
@@ -186,6 +227,15 @@ async def get_status(authenticated: bool = Depends(verify_auth)):
         elapsed = time.time() - global_state.demo_start_time
         demo_time_remaining = max(0, global_state.demo_limit_seconds - elapsed)
     
+    now = time.monotonic()
+    version = global_state.last_update
+    if (_status_cache["payload"] is not None
+            and _status_cache["version"] == version
+            and now < _status_cache["expires_at"]):
+        return Response(content=_status_cache["payload"], media_type="application/json")
+    
+    timeframes = _get_strategy_timeframes()
+    
     def _filter_simplified_logs(logs: List[str]) -> List[str]:
         agent_tags = [
             '[📊 SYSTEM]',
@@ -261,80 +311,88 @@ async def get_status(authenticated: bool = Depends(verify_auth)):
                 continue
         return filtered
 
-    with global_state.locked():
+    gs = global_state
+    with gs.locked():
         log_tail = 200
         simplified_tail = 300
-        logs_tail = global_state.recent_logs[-log_tail:]
-        simplified_logs = _filter_simplified_logs(global_state.recent_logs[-simplified_tail:])
+        recent_logs = gs.tail_logs(simplified_tail)
+        logs_tail = recent_logs[-log_tail:]
+        simplified_logs = _filter_simplified_logs(recent_logs)
         if len(simplified_logs) > log_tail:
             simplified_logs = simplified_logs[-log_tail:]
 
-        account_payload = dict(global_state.account_overview or {})
-        realized_pnl = float(getattr(global_state, 'cumulative_realized_pnl', 0.0) or 0.0)
+        account_payload = dict(gs.account_overview or {})
+        realized_pnl = float(getattr(gs, 'cumulative_realized_pnl', 0.0) or 0.0)
         unrealized_pnl = float(account_payload.get('total_pnl', 0.0) or 0.0)
         account_payload['realized_pnl'] = realized_pnl
         account_payload['unrealized_pnl'] = unrealized_pnl
         account_payload['total_pnl'] = realized_pnl + unrealized_pnl
 
+        virtual_balance = gs.virtual_balance
+        virtual_positions = gs.virtual_positions.values()
+        is_test_mode = gs.is_test_mode
+
         data = {
             "system": {
-                "running": global_state.is_running,
-                "mode": global_state.execution_mode,
-                "is_test_mode": global_state.is_test_mode,
-                "cycle_counter": global_state.cycle_counter,
-                "cycle_interval": global_state.cycle_interval,
-                "current_cycle_id": global_state.current_cycle_id,
-                "uptime_start": global_state.start_time,
-                "last_heartbeat": global_state.last_update,
-                "symbols": global_state.symbols,  # 🆕 Active trading symbols (AI500 Top5 support)
+                "running": gs.is_running,
+                "mode": gs.execution_mode,
+                "is_test_mode": is_test_mode,
+                "cycle_counter": gs.cycle_counter,
+                "cycle_interval": gs.cycle_interval,
+                "current_cycle_id": gs.current_cycle_id,
+                "uptime_start": gs.start_time,
+                "last_heartbeat": gs.last_update,
+                "symbols": gs.symbols,  # 🆕 Active trading symbols (AI500 Top5 support)
                 "timeframes": timeframes,
-                "current_symbol": getattr(global_state, 'current_symbol', '')
+                "current_symbol": getattr(gs, 'current_symbol', '')
             },
             "demo": {
-                "demo_mode_active": global_state.demo_mode_active,
-                "demo_expired": global_state.demo_expired,
+                "demo_mode_active": gs.demo_mode_active,
+                "demo_expired": gs.demo_expired,
                 "demo_time_remaining": int(demo_time_remaining)
             },
             "market": {
-                "price": global_state.current_price,
-                "regime": global_state.market_regime,
-                "position": global_state.price_position
+                "price": gs.current_price,
+                "regime": gs.market_regime,
+                "position": gs.price_position
             },
             "agents": {
-                "critic_confidence": global_state.critic_confidence,
-                "guardian_status": global_state.guardian_status,
-                "symbol_selector": getattr(global_state, 'symbol_selector', {}),
-                "agent_messages": global_state.agent_messages,  # [NEW] Chatroom messages
-                "agent_events": global_state.agent_events
+                "critic_confidence": gs.critic_confidence,
+                "guardian_status": gs.guardian_status,
+                "symbol_selector": getattr(gs, 'symbol_selector', {}),
+                "agent_messages": gs.agent_messages,  # [NEW] Chatroom messages
+                "agent_events": gs.agent_events
             },
             "account": account_payload,
             "virtual_account": {
-                "is_test_mode": global_state.is_test_mode,
-                "initial_balance": global_state.virtual_initial_balance,
-                "current_balance": global_state.virtual_balance,
-                "available_balance": global_state.virtual_balance - sum((pos.get('position_value', 0) / pos.get('leverage', 1)) for pos in global_state.virtual_positions.values()),
-                "positions": global_state.virtual_positions,
-                "total_unrealized_pnl": sum(pos.get('unrealized_pnl', 0) for pos in global_state.virtual_positions.values()),
-                "cumulative_realized_pnl": global_state.cumulative_realized_pnl  # Total realized PnL from closed trades
+                "is_test_mode": is_test_mode,
+                "initial_balance": gs.virtual_initial_balance,
+                "current_balance": virtual_balance,
+                "available_balance": virtual_balance - sum((pos.get('position_value', 0) / pos.get('leverage', 1)) for pos in virtual_positions),
+                "positions": gs.virtual_positions,
+                "total_unrealized_pnl": sum(pos.get('unrealized_pnl', 0) for pos in virtual_positions),
+                "cumulative_realized_pnl": gs.cumulative_realized_pnl  # Total realized PnL from closed trades
             },
             "account_alert": {
-                "active": global_state.account_alert_active,
-                "failure_count": global_state.account_failure_count
+                "active": gs.account_alert_active,
+                "failure_count": gs.account_failure_count
             },
             "chart_data": {
-                "equity": global_state.equity_history,
-                "balance_history": global_state.balance_history,
-                "initial_balance": global_state.initial_balance
+                "equity": gs.equity_history,
+                "balance_history": gs.balance_history,
+                "initial_balance": gs.initial_balance
             },
-            "decision": global_state.latest_decision,
-            "decision_history": global_state.decision_history[:10],
-            "trade_history": global_state.trade_history[:200],
+            "decision": gs.latest_decision,
+            "decision_history": list(islice(gs.decision_history, 10)),
+            "trade_history": gs.trade_history[:200],
             "logs": logs_tail,
             "logs_simplified": simplified_logs,
-            "llm_info": global_state.llm_info,
-            "agent_prompts": global_state.agent_prompts
+            "llm_info": gs.llm_info,
+            "agent_prompts": gs.agent_prompts
         }
-        return clean_nans(global_state._serialize_obj(data))
+        payload = dump_json(gs._serialize_obj(data))
+    _status_cache.update(version=version, expires_at=now + STATUS_CACHE_TTL_SEC, payload=payload)
+    return Response(content=payload, media_type="application/json")
 
 @app.post("/api/control")
 async def control_bot(cmd: ControlCommand, authenticated: bool = Depends(verify_admin)):
@@ -386,7 +444,7 @@ async def control_bot(cmd: ControlCommand, authenticated: bool = Depends(verify_
             global_state.cycle_positions_opened = 0
             # 🆕 清空交易记录，防止使用历史数据进行复盘
             global_state.trade_history = []
-            global_state.decision_history = []
+            global_state.decision_history.clear()
             global_state.balance_history = []
             switch_handler = getattr(global_state, "mode_switch_handler", None)
             if callable(switch_handler):
@@ -496,7 +554,7 @@ async def test_log(authenticated: bool = Depends(verify_auth)):
     return {
         "status": "success",
         "logs_count": len(global_state.recent_logs),
-        "latest_logs": global_state.recent_logs[-5:] if global_state.recent_logs else []
+        "latest_logs": global_state.tail_logs(5)
     }
 
 @app.get("/api/symbol_stats")
@@ -1091,34 +1149,34 @@ async def subscribe_to_backtest(session_id: str, authenticated: bool = Depends(v
         
         # First, send the latest state to catch up
         if session.latest_data:
-            yield json.dumps({
+            yield dump_json({
                 'type': 'progress',
                 'session_id': session_id,
                 **session.latest_data
-            }) + '\n'
+            }) + b'\n'
         
         try:
             while session.status == 'running':
                 try:
                     data = await asyncio.wait_for(queue.get(), timeout=30)
-                    yield json.dumps(data) + '\n'
+                    yield dump_json(data) + b'\n'
                 except asyncio.TimeoutError:
                     # Send keepalive
-                    yield json.dumps({'type': 'keepalive'}) + '\n'
+                    yield dump_json({'type': 'keepalive'}) + b'\n'
             
             # Session completed, send final result if available
             if session.result:
-                yield json.dumps({
+                yield dump_json({
                     'type': 'result',
                     'data': session.result,
                     'session_id': session_id
-                }) + '\n'
+                }) + b'\n'
             elif session.error:
-                yield json.dumps({
+                yield dump_json({
                     'type': 'error',
                     'message': session.error,
                     'session_id': session_id
-                }) + '\n'
+                }) + b'\n'
         finally:
             if queue in session.subscribers:
                 session.subscribers.remove(queue)
@@ -1283,8 +1341,7 @@ async def run_backtest(config: BacktestRequest, authenticated: bool = Depends(ve
                     # Helper for NaNs
                     def recursive_clean(obj):
                         if isinstance(obj, float):
-                            if math.isnan(obj) or math.isinf(obj): return 0.0
-                            return obj
+                            return obj if math.isfinite(obj) else 0.0
                         if isinstance(obj, dict):
                             return {k: recursive_clean(v) for k, v in obj.items()}
                         if isinstance(obj, list):
@@ -1508,7 +1565,7 @@ async def run_backtest(config: BacktestRequest, authenticated: bool = Depends(ve
                 data = await queue.get()
                 if data is None:
                     break
-                yield json.dumps(data) + "\n"
+                yield dump_json(data) + b"\n"
         
         return StreamingResponse(event_generator(), media_type="application/x-ndjson")
 
@@ -1580,8 +1637,24 @@ async def serve_app_js():
 async def serve_i18n_js():
     return FileResponse(os.path.join(WEB_DIR, 'i18n.js'), media_type='application/javascript')
 
+class CachingStaticFiles(StaticFiles):
+    """StaticFiles with Cache-Control: versioned assets (?v=...) are cached as immutable,
+    everything else is revalidated against the ETag StaticFiles already emits."""
+
+    IMMUTABLE_SUFFIXES = (".js", ".css", ".woff2", ".png", ".svg")
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            query = QueryParams(scope.get("query_string", b""))
+            if "v" in query and path.endswith(self.IMMUTABLE_SUFFIXES):
+                response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            else:
+                response.headers["Cache-Control"] = "no-cache"
+        return response
+
 # Serve Static Files
-app.mount("/static", StaticFiles(directory=WEB_DIR), name="static")
+app.mount("/static", CachingStaticFiles(directory=WEB_DIR), name="static")
 
 # Serve Reports Directory
 reports_dir = os.path.join(BASE_DIR, 'reports')
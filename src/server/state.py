@@ -1,10 +1,14 @@
 from src.utils.logger import log
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Deque
 from dataclasses import dataclass, field
 from datetime import datetime
+from collections import deque
+from itertools import islice
 import json
 import threading
 
+_JSON_SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
+
 @dataclass
 class SharedState:
     """Global state shared between Trading Loop and API Server"""
@@ -72,11 +76,11 @@ class SharedState:
     
     # Latest Decision & History
     latest_decision: Dict[str, Any] = field(default_factory=dict) # Keyed by symbol now
-    decision_history: List[Dict] = field(default_factory=list)
+    decision_history: Deque[Dict] = field(default_factory=lambda: deque(maxlen=100))  # Newest first
     
     # History
     trade_history: List[Dict] = field(default_factory=list)
-    recent_logs: List[str] = field(default_factory=list)
+    recent_logs: Deque[str] = field(default_factory=lambda: deque(maxlen=500))
     
     # Reflection Agent State
     reflection_count: int = 0
@@ -136,6 +140,16 @@ class SharedState:
 
     def _serialize_obj(self, obj):
         """Recursively serialize non-JSON-compatible types (datetime, numpy, pd.Timestamp)"""
+        # Fast paths: containers and native JSON scalars make up nearly all nodes,
+        # so handle them before the numpy/pandas type checks.
+        if type(obj) is dict:
+            serialize = self._serialize_obj
+            return {k: serialize(v) for k, v in obj.items()}
+        if type(obj) is list:
+            serialize = self._serialize_obj
+            return [serialize(v) for v in obj]
+        if type(obj) in _JSON_SCALAR_TYPES:
+            return obj
         import numpy as np
         import pandas as pd
         from datetime import datetime
@@ -173,9 +187,7 @@ class SharedState:
                 decision['timestamp'] = datetime.now().strftime("%H:%M:%S")
 
             # Add to history
-            self.decision_history.insert(0, decision)  # Prepend
-            if len(self.decision_history) > 100:
-                self.decision_history.pop()
+            self.decision_history.appendleft(decision)  # Prepend (oldest evicted by maxlen)
 
             self.last_update = datetime.now().strftime("%H:%M:%S")
 
@@ -324,8 +336,12 @@ class SharedState:
                 message = f"[{timestamp}] {message}"
                 
             self.recent_logs.append(message)
-            if len(self.recent_logs) > 500:
-                self.recent_logs.pop(0)
+    
+    def tail_logs(self, n: int) -> List[str]:
+        """Return the newest n log lines (oldest first) as a list"""
+        with self._lock:
+            logs = self.recent_logs
+            return list(islice(logs, max(0, len(logs) - n), None))
     
     def clear_init_logs(self):
         """Clear initialization logs when Cycle 1 starts to sync with Recent Decisions."""
@@ -353,8 +369,6 @@ class SharedState:
             # Directly append to recent_logs
             with self._lock:
                 self.recent_logs.append(formatted)
-                if len(self.recent_logs) > 500:
-                    self.recent_logs.pop(0)
         
         # Add sink for INFO and above
         log.add(sink, level="INFO")
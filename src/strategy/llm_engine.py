@@ -4,17 +4,56 @@ LLM 策略推理引擎 (Multi-Provider Support)
 
 支持多种 LLM 提供商: OpenAI, DeepSeek, Claude, Qwen, Gemini, Kimi, MiniMax, GLM
 """
-import json
+import asyncio
+import orjson
 import re
-from typing import Dict, Optional
+import threading
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 import os
-import httpx
 from src.config import config
 from src.utils.logger import log
-from src.utils.action_protocol import VALID_ACTIONS
+from src.utils.action_protocol import VALID_ACTIONS, OPEN_ACTIONS
 from src.strategy.llm_parser import LLMOutputParser
 from src.strategy.decision_validator import DecisionValidator
-from src.llm import create_client, LLMConfig
+
+# 同时在途的决策请求上限（按 LLM 服务商的 RPM 档位调整）
+MAX_CONCURRENT_DECISIONS = 4
+
+# validate_decision 要求的决策字段
+_REQUIRED_DECISION_FIELDS = frozenset({
+    'action', 'symbol', 'confidence', 'leverage',
+    'position_size_pct', 'stop_loss_pct', 'take_profit_pct', 'reasoning'
+})
+
+# LLM 不可用/失败时的保守决策模板（_get_fallback_decision 浅拷贝后填入 symbol/timestamp）
+_FALLBACK_DECISION = {
+    'action': 'wait',
+    'symbol': 'BTCUSDT',
+    'confidence': 0,
+    'leverage': 1,
+    'position_size_pct': 0,
+    'stop_loss_pct': 1.0,
+    'take_profit_pct': 2.0,
+    'reasoning': 'LLM decision failed, using conservative fallback strategy',
+    'timestamp': None,
+    'is_fallback': True
+}
+
+# 批量决策：单次请求最多合并的交易对数量，以及整批输出 token 上限
+MAX_BATCH_SYMBOLS = 5
+BATCH_MAX_OUTPUT_TOKENS = 8000
+
+# 决策输出的结束标签（见 LLMOutputParser），流式接收到即停止
+DECISION_END_TAG = '</decision>'
+
+# src/strategy/llm_engine.py -> <repo>/config/custom_prompt.md
+_CUSTOM_PROMPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'config', 'custom_prompt.md'
+)
+# 系统提示词缓存: key 为自定义提示词文件的 (mtime_ns, size)，文件不存在时为 None
+_system_prompt_cache: Dict = {'key': False, 'prompt': None}
 
 
 def _extract_json_robust(text: str) -> Optional[Dict]:
@@ -33,8 +72,8 @@ def _extract_json_robust(text: str) -> Optional[Dict]:
     md_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', text)
     if md_match:
         try:
-            return json.loads(md_match.group(1))
-        except json.JSONDecodeError:
+            return orjson.loads(md_match.group(1))
+        except orjson.JSONDecodeError:
             pass
     
     # Pattern 2: Find balanced JSON object
@@ -49,8 +88,8 @@ def _extract_json_robust(text: str) -> Optional[Dict]:
                 depth -= 1
                 if depth == 0:
                     try:
-                        return json.loads(text[start:i+1])
-                    except json.JSONDecodeError:
+                        return orjson.loads(text[start:i+1])
+                    except orjson.JSONDecodeError:
                         break
     
     return None
@@ -59,6 +98,10 @@ def _extract_json_robust(text: str) -> Optional[Dict]:
 class StrategyEngine:
     """多 LLM 提供商策略决策引擎"""
     
+    # 所有实例共享：限制并发决策请求数量。LLM 客户端是同步的，调用在线程池中执行，
+    # 因此使用线程信号量而非绑定事件循环的 asyncio.Semaphore
+    _decision_slots = threading.BoundedSemaphore(MAX_CONCURRENT_DECISIONS)
+    
     def __init__(self):
         # 获取 LLM 配置
         llm_config = config.llm
@@ -103,6 +146,9 @@ class StrategyEngine:
             
     def _init_client(self, api_key: str, llm_config: Dict):
         """Initialize LLM Client"""
+        # 延迟导入：src.llm 会加载 httpx 及全部提供商客户端，LLM 未启用时无需付出这部分启动开销
+        from src.llm import create_client, LLMConfig
+        
         llm_cfg = LLMConfig(
             api_key=api_key,
             base_url=llm_config.get('base_url'),
@@ -113,6 +159,8 @@ class StrategyEngine:
             max_tokens=self.max_tokens
         )
         try:
+            # 重新加载配置时释放旧客户端的连接池
+            self.close()
             self.client = create_client(self.provider, llm_cfg)
             self.is_ready = True
             log.info(f"🤖 Strategy Engine initialized (Provider: {self.provider}, Model: {self.model})")
@@ -120,6 +168,15 @@ class StrategyEngine:
             log.error(f"Failed to create LLM client: {e}")
             self.is_ready = False
     
+    def close(self):
+        """关闭 LLM 客户端的 HTTP 连接池"""
+        client, self.client = self.client, None
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                log.warning(f"Failed to close LLM client: {e}")
+    
     def reload_config(self):
         """Reload configuration from global config"""
         # Re-fetch config
@@ -134,7 +191,7 @@ class StrategyEngine:
         if provider.lower() in ('none', 'disabled', 'off') or disable_env:
             self.disable_llm = True
             self.is_ready = False
-            self.client = None
+            self.close()
             log.info("🚫 Strategy Engine LLM disabled by config (reload)")
             return False
         
@@ -200,79 +257,191 @@ class StrategyEngine:
 
         
         try:
-            response = self.client.chat(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
+            with self._decision_slots:
+                response = self.client.chat(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                    # 决策块结束即可解析，无需等待模型输出剩余 token
+                    stop_after=DECISION_END_TAG
+                )
             
             # 获取原始响应
             content = response.content
             
             # 使用新解析器解析结构化输出
             parsed = self.parser.parse(content)
-            decision = parsed['decision']
-            reasoning = parsed['reasoning']
-            
-            # 标准化 action 字段
-            if 'action' in decision:
-                decision['action'] = self.parser.normalize_action(
-                    decision['action'],
-                    position_side=market_context_data.get('position_side')
-                )
-            
-            # 验证决策
-            is_valid, errors = self.validator.validate(decision)
-            if not is_valid:
-                log.warning(f"LLM 决策验证失败: {errors}")
-                log.warning(f"原始决策: {decision}")
-                return self._get_fallback_decision(market_context_data)
-            
-            # 记录 LLM 输出
-            log.llm_output(f"{self.provider} 返回决策结果", decision)
-            if reasoning:
-                log.info(f"推理过程:\n{reasoning}")
-            
-            # 记录决策
-            log.llm_decision(
-                action=decision.get('action', 'wait'),
-                confidence=decision.get('confidence', 0),
-                reasoning=decision.get('reasoning', reasoning)
+            decision = self._finalize_decision(
+                parsed['decision'], parsed['reasoning'], content,
+                market_context_data, system_prompt, user_prompt
             )
-            
-            # 添加元数据
-            decision['timestamp'] = market_context_data['timestamp']
-            decision['symbol'] = market_context_data['symbol']
-            decision['model'] = self.model
-            decision['raw_response'] = content
-            decision['reasoning_detail'] = reasoning
-            decision['validation_passed'] = True
-            
-            # ✅ Return full prompt for logging
-            decision['system_prompt'] = system_prompt
-            decision['user_prompt'] = user_prompt
-            
-            # 🐂🐻 Add Bull/Bear perspectives for dashboard
-            decision['bull_perspective'] = bull_perspective
-            decision['bear_perspective'] = bear_perspective
-            
+            if decision.get('validation_passed'):
+                # 🐂🐻 Add Bull/Bear perspectives for dashboard
+                decision.update({
+                    'bull_perspective': bull_perspective,
+                    'bear_perspective': bear_perspective,
+                })
             return decision
             
-        except httpx.HTTPStatusError as e:
-            if e.response is not None and e.response.status_code in (401, 402, 403):
-                self.disable_llm = True
-                self.is_ready = False
-                self.client = None
-                log.error(f"LLM decision failed: {e} (LLM disabled)")
-            else:
-                log.error(f"LLM decision failed: {e}")
+        except Exception as e:
+            self._handle_llm_error(e)
             # 返回保守决策
             return self._get_fallback_decision(market_context_data)
+    
+    def make_decisions_batch(self, contexts: List[Tuple[str, Dict]], reflection: str = None) -> List[Dict]:
+        """
+        多交易对批量决策：多个交易对合并为一次 LLM 请求，system prompt 只发送一次
+        
+        Args:
+            contexts: [(market_context_text, market_context_data), ...]
+            reflection: 可选的交易反思文本（整批共享）
+            
+        Returns:
+            与 contexts 顺序一致的决策列表；某个交易对缺失或无效时返回其兜底决策
+            
+        注意：批量模式不生成 Bull/Bear 观点（逐个交易对调用会抵消合并请求的收益）。
+        """
+        batch_size = max(1, min(MAX_BATCH_SYMBOLS, BATCH_MAX_OUTPUT_TOKENS // max(1, self.max_tokens)))
+        decisions: List[Dict] = []
+        for start in range(0, len(contexts), batch_size):
+            # 只剩一个交易对的批次也走批量路径：同样只发一次请求，返回结构一致
+            decisions.extend(self._make_batch_decision(contexts[start:start + batch_size], reflection))
+        return decisions
+    
+    def _make_batch_decision(self, chunk: List[Tuple[str, Dict]], reflection: str = None) -> List[Dict]:
+        """对一批交易对发起单次 LLM 请求，并按 symbol 映射回输入顺序"""
+        if self.disable_llm or (not self.is_ready and not self.reload_config()):
+            return [self._get_fallback_decision(data) for _, data in chunk]
+        
+        system_prompt = self._build_system_prompt()
+        user_prompt = self._build_batch_user_prompt(chunk, reflection)
+        symbols = [data['symbol'] for _, data in chunk]
+        log.llm_input(f"正在发送 {len(chunk)} 个交易对的市场数据到 {self.provider}...", ", ".join(symbols))
+        
+        try:
+            with self._decision_slots:
+                response = self.client.chat(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens * len(chunk),
+                    stop_after=DECISION_END_TAG
+                )
         except Exception as e:
-            log.error(f"LLM decision failed: {e}")
-            # 返回保守决策
+            self._handle_llm_error(e)
+            return [self._get_fallback_decision(data) for _, data in chunk]
+        
+        content = response.content
+        parsed = self.parser.parse_batch(content)
+        returned = parsed['decisions']
+        by_symbol = {
+            str(d.get('symbol', '')).upper(): d for d in returned if d.get('symbol')
+        }
+        
+        results = []
+        for index, (_, data) in enumerate(chunk):
+            decision = by_symbol.get(data['symbol'].upper())
+            # 模型未填写 symbol 但数量一致时按位置对应
+            if decision is None and len(returned) == len(chunk) and not returned[index].get('symbol'):
+                decision = returned[index]
+            if decision is None:
+                log.warning(f"批量决策缺少 {data['symbol']}，使用兜底决策")
+                results.append(self._get_fallback_decision(data))
+                continue
+            decision = self._finalize_decision(
+                dict(decision), parsed['reasoning'], content,
+                data, system_prompt, user_prompt
+            )
+            if decision.get('validation_passed'):
+                decision['batch_size'] = len(chunk)
+            results.append(decision)
+        return results
+    
+    def _finalize_decision(
+        self,
+        decision: Dict,
+        reasoning: str,
+        content: str,
+        market_context_data: Dict,
+        system_prompt: str,
+        user_prompt: str
+    ) -> Dict:
+        """标准化、验证解析出的决策并附加元数据；验证失败时返回兜底决策"""
+        # 标准化 action 字段
+        if 'action' in decision:
+            decision['action'] = self.parser.normalize_action(
+                decision['action'],
+                position_side=market_context_data.get('position_side')
+            )
+        
+        # 验证决策
+        is_valid, errors = self.validator.validate(decision)
+        if not is_valid:
+            log.warning(f"LLM 决策验证失败: {errors}")
+            log.warning(f"原始决策: {decision}")
             return self._get_fallback_decision(market_context_data)
+        
+        # 记录 LLM 输出
+        log.llm_output(f"{self.provider} 返回决策结果", decision)
+        if reasoning:
+            log.info(f"推理过程:\n{reasoning}")
+        
+        # 记录决策
+        log.llm_decision(
+            action=decision.get('action', 'wait'),
+            confidence=decision.get('confidence', 0),
+            reasoning=decision.get('reasoning', reasoning)
+        )
+        
+        # 添加元数据
+        decision.update({
+            'timestamp': market_context_data['timestamp'],
+            'symbol': market_context_data['symbol'],
+            'model': self.model,
+            'raw_response': content,
+            'reasoning_detail': reasoning,
+            'validation_passed': True,
+            # ✅ Return full prompt for logging
+            'system_prompt': system_prompt,
+            'user_prompt': user_prompt,
+        })
+        return decision
+    
+    def _handle_llm_error(self, e: Exception):
+        """记录 LLM 调用失败；认证/计费错误 (401/402/403) 时禁用 LLM"""
+        # 走到这里客户端已创建，httpx 已加载，局部导入无额外开销
+        import httpx
+        if (
+            isinstance(e, httpx.HTTPStatusError)
+            and e.response is not None
+            and e.response.status_code in (401, 402, 403)
+        ):
+            self.disable_llm = True
+            self.is_ready = False
+            self.close()
+            log.error(f"LLM decision failed: {e} (LLM disabled)")
+        else:
+            log.error(f"LLM decision failed: {e}")
+    
+    async def make_decision_async(self, market_context_text: str, market_context_data: Dict, reflection: str = None, bull_perspective: Dict = None, bear_perspective: Dict = None) -> Dict:
+        """
+        make_decision 的异步版本：在线程池中执行，不阻塞事件循环
+        
+        多个交易对可通过 asyncio.gather 并发决策，并发数受 MAX_CONCURRENT_DECISIONS 限制。
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            partial(
+                self.make_decision,
+                market_context_text,
+                market_context_data,
+                reflection=reflection,
+                bull_perspective=bull_perspective,
+                bear_perspective=bear_perspective
+            )
+        )
     
     def get_bull_perspective(self, market_context_text: str) -> Dict:
         """
@@ -388,31 +557,45 @@ Focus ONLY on bearish factors. Ignore bullish signals."""
             return {"bearish_reasons": "Analysis unavailable", "bear_confidence": 50}
     
     def _build_system_prompt(self) -> str:
-        """Build System Prompt (English Version) or Load Custom"""
-        import os
+        """Build System Prompt (English Version) or Load Custom
+        
+        结果按自定义提示词文件的 (mtime, size) 缓存：文件未变化时每次返回同一字符串，
+        保证 system 消息逐字节一致以命中服务端前缀缓存；上传新提示词后下一轮自动生效。
+        """
+        try:
+            st = os.stat(_CUSTOM_PROMPT_PATH)
+            cache_key = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            cache_key = None
         
-        # Check for custom prompt
-        # Assuming src/strategy/llm_engine.py, so config is ../../config/custom_prompt.md
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        custom_prompt_path = os.path.join(base_dir, 'config', 'custom_prompt.md')
+        if _system_prompt_cache['key'] == cache_key and _system_prompt_cache['prompt'] is not None:
+            return _system_prompt_cache['prompt']
         
-        if os.path.exists(custom_prompt_path):
+        prompt = None
+        if cache_key is not None:
             try:
-                with open(custom_prompt_path, 'r', encoding='utf-8') as f:
+                with open(_CUSTOM_PROMPT_PATH, 'r', encoding='utf-8') as f:
                     content = f.read()
                     if content.strip():
                         log.info("📝 Loading Custom System Prompt from file")
-                        return content
+                        prompt = content
             except Exception as e:
                 log.error(f"Failed to load custom prompt: {e}")
+                # 读取失败不缓存，下一轮重试
+                cache_key = False
         
-        # Load default from template
-        try:
-            from src.config.default_prompt_template import DEFAULT_SYSTEM_PROMPT
-            return DEFAULT_SYSTEM_PROMPT
-        except ImportError:
-            log.error("Failed to import DEFAULT_SYSTEM_PROMPT")
-            return "Error: Default prompt missing"
+        if prompt is None:
+            # Load default from template
+            try:
+                from src.config.default_prompt_template import DEFAULT_SYSTEM_PROMPT
+                prompt = DEFAULT_SYSTEM_PROMPT
+            except ImportError:
+                log.error("Failed to import DEFAULT_SYSTEM_PROMPT")
+                return "Error: Default prompt missing"
+        
+        _system_prompt_cache['key'] = cache_key
+        _system_prompt_cache['prompt'] = prompt
+        return prompt
     
     def _build_user_prompt(self, market_context: str, bull_perspective: Dict = None, bear_perspective: Dict = None, reflection: str = None) -> str:
         """Build User Prompt - DATA ONLY (No instructions, all rules are in system prompt)"""
@@ -456,6 +639,34 @@ Focus ONLY on bearish factors. Ignore bullish signals."""
 ---
 
 Analyze the above data following the strategy rules in system prompt. Output your decision.
+"""
+    
+    def _build_batch_user_prompt(self, chunk: List[Tuple[str, Dict]], reflection: str = None) -> str:
+        """Build batch User Prompt - one section per symbol, output format spelled out here
+        so the system prompt stays byte-identical to single-symbol calls (prefix cache)."""
+        sections = "\n---\n".join(
+            f"## Symbol {i}: {data['symbol']}\n\n{text}"
+            for i, (text, data) in enumerate(chunk, 1)
+        )
+        
+        reflection_section = ""
+        if reflection:
+            reflection_section = f"""
+---
+## 🧠 Trading Reflection (Last 10 Trades)
+
+{reflection}
+"""
+        
+        return f"""# 📊 MARKET DATA INPUT ({len(chunk)} symbols)
+
+{sections}
+{reflection_section}
+---
+
+Analyze EACH symbol above independently, following the strategy rules in system prompt.
+Output a single <decision> block whose JSON is an array with exactly {len(chunk)} decision objects,
+one per symbol in the order listed, each with its "symbol" field set.
 """
     
     def _get_fallback_decision(self, context: Dict) -> Dict:
@@ -465,16 +676,9 @@ Analyze the above data following the strategy rules in system prompt. Output you
         返回保守的hold决策
         """
         return {
-            'action': 'wait',
+            **_FALLBACK_DECISION,
             'symbol': context.get('symbol', 'BTCUSDT'),
-            'confidence': 0,
-            'leverage': 1,
-            'position_size_pct': 0,
-            'stop_loss_pct': 1.0,
-            'take_profit_pct': 2.0,
-            'reasoning': 'LLM decision failed, using conservative fallback strategy',
             'timestamp': context.get('timestamp'),
-            'is_fallback': True
         }
     
     def validate_decision(self, decision: Dict) -> bool:
@@ -484,16 +688,11 @@ Analyze the above data following the strategy rules in system prompt. Output you
         Returns:
             True if valid, False otherwise
         """
-        required_fields = [
-            'action', 'symbol', 'confidence', 'leverage',
-            'position_size_pct', 'stop_loss_pct', 'take_profit_pct', 'reasoning'
-        ]
-        
         # 检查必需字段
-        for field in required_fields:
-            if field not in decision:
-                log.error(f"决策缺少必需字段: {field}")
-                return False
+        missing = _REQUIRED_DECISION_FIELDS - decision.keys()
+        if missing:
+            log.error(f"决策缺少必需字段: {', '.join(sorted(missing))}")
+            return False
         
         # 检查action合法性
         if decision['action'] not in VALID_ACTIONS:
@@ -530,7 +729,7 @@ Analyze the above data following the strategy rules in system prompt. Output you
         elif 'volatile' in reasoning_lower:
              regime_threshold = 70
             
-        if action in ['open_long', 'open_short'] and confidence < regime_threshold:
+        if action in OPEN_ACTIONS and confidence < regime_threshold:
             log.warning(f"🚫 Confidence {confidence}% < Threshold {regime_threshold}% for {action}, converting to 'wait'")
             decision['action'] = 'wait'
             decision['reasoning'] = f"Low confidence ({confidence}% < {regime_threshold}% dynamic threshold), wait for better setup"
@@ -19,8 +19,8 @@ LLM 输出解析器
 """
 
 import re
-import json
-from typing import Dict, Optional, Tuple
+import orjson
+from typing import Any, Dict, List, Optional, Tuple
 from src.utils.logger import log
 from src.utils.action_protocol import normalize_action
 
@@ -221,49 +221,98 @@ class LLMOutputParser:
                         json_str = text[start_idx:i + 1]
                         # 验证是否可解析
                         try:
-                            json.loads(json_str)
+                            orjson.loads(json_str)
                             return json_str
-                        except json.JSONDecodeError:
+                        except orjson.JSONDecodeError:
                             # 继续寻找下一个可能的 JSON
                             return None
         
         return None
 
     
-    def _parse_json_with_fallback(self, json_str: str) -> Dict:
+    def parse_batch(self, llm_response: str) -> Dict:
         """
-        带容错的 JSON 解析
+        解析多交易对批量决策输出（<decision> 内为 JSON 数组，每个交易对一个对象）
         
         Args:
-            json_str: JSON 字符串
+            llm_response: LLM 原始响应
             
         Returns:
-            解析后的字典
+            {
+                'reasoning': str,  # 推理过程
+                'decisions': list,  # 含 action 字段的决策字典，保持输出顺序
+                'raw_response': str  # 原始响应
+            }
+        """
+        decisions: List[Dict] = []
+        reasoning = None
+        try:
+            reasoning = self._extract_tag_content(llm_response, 'reasoning')
+            
+            decision_json = None
+            for tag in self.supported_tags:
+                decision_json = self._extract_tag_content(llm_response, tag)
+                if decision_json:
+                    break
+            if not decision_json:
+                decision_json = self._extract_json_from_text(llm_response)
+            
+            data = self._loads_lenient(decision_json) if decision_json else None
+            # 兼容 {"decisions": [...]} 及单个对象
+            if isinstance(data, dict):
+                data = data.get('decisions', [data])
+            if isinstance(data, list):
+                decisions = [d for d in data if isinstance(d, dict) and 'action' in d]
+            if not decisions:
+                log.warning("批量决策输出中未找到有效决策")
+        except Exception as e:
+            log.error(f"LLM 批量输出解析失败: {e}")
+        
+        return {
+            'reasoning': reasoning or '',
+            'decisions': decisions,
+            'raw_response': llm_response
+        }
+    
+    def _loads_lenient(self, json_str: str) -> Any:
+        """
+        带容错的 JSON 解析，返回原始结构（对象或数组），失败返回 None
         """
         # 1. 预处理：修正常见格式错误
         normalized = self._normalize_characters(json_str)
         
         # 2. 尝试直接解析
         try:
-            data = json.loads(normalized)
-            # 如果是数组，取第一个元素
-            if isinstance(data, list) and len(data) > 0:
-                data = data[0]
-            return data
-        except json.JSONDecodeError:
+            return orjson.loads(normalized)
+        except orjson.JSONDecodeError:
             pass
         
         # 3. 尝试移除尾部逗号后解析
         try:
             cleaned = re.sub(r',\s*}', '}', normalized)
             cleaned = re.sub(r',\s*\]', ']', cleaned)
-            data = json.loads(cleaned)
-            if isinstance(data, list) and len(data) > 0:
-                data = data[0]
-            return data
-        except json.JSONDecodeError as e:
+            return orjson.loads(cleaned)
+        except orjson.JSONDecodeError as e:
             log.error(f"JSON 解析失败（即使修正后）: {e}")
+            return None
+    
+    def _parse_json_with_fallback(self, json_str: str) -> Dict:
+        """
+        带容错的 JSON 解析
+        
+        Args:
+            json_str: JSON 字符串
+            
+        Returns:
+            解析后的字典
+        """
+        data = self._loads_lenient(json_str)
+        if data is None:
             return {}
+        # 如果是数组，取第一个元素
+        if isinstance(data, list) and len(data) > 0:
+            data = data[0]
+        return data
     
     def _normalize_characters(self, text: str) -> str:
         """
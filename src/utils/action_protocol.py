@@ -9,6 +9,7 @@ Canonical actions:
 """
 
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 
 
@@ -40,30 +41,38 @@ PASSIVE_ACTIONS = frozenset({
 VALID_ACTIONS = OPEN_ACTIONS | CLOSE_ACTIONS | PASSIVE_ACTIONS
 
 
+_ACTION_ALIASES = {
+    "open_long": Action.OPEN_LONG.value,
+    "long": Action.OPEN_LONG.value,
+    "buy": Action.OPEN_LONG.value,
+    "go_long": Action.OPEN_LONG.value,
+    "open_short": Action.OPEN_SHORT.value,
+    "short": Action.OPEN_SHORT.value,
+    "sell": Action.OPEN_SHORT.value,
+    "go_short": Action.OPEN_SHORT.value,
+    "close_long": Action.CLOSE_LONG.value,
+    "exit_long": Action.CLOSE_LONG.value,
+    "close_short": Action.CLOSE_SHORT.value,
+    "exit_short": Action.CLOSE_SHORT.value,
+    "wait": Action.WAIT.value,
+    "skip": Action.WAIT.value,
+    "hold": Action.HOLD.value,
+}
+
+
 def normalize_action(action: Optional[str], position_side: Optional[str] = None) -> str:
     """Normalize aliases to canonical action values."""
-    raw = str(action or "").strip().lower()
-    side = str(position_side or "").strip().lower()
-
-    mapping = {
-        "open_long": Action.OPEN_LONG.value,
-        "long": Action.OPEN_LONG.value,
-        "buy": Action.OPEN_LONG.value,
-        "go_long": Action.OPEN_LONG.value,
-        "open_short": Action.OPEN_SHORT.value,
-        "short": Action.OPEN_SHORT.value,
-        "sell": Action.OPEN_SHORT.value,
-        "go_short": Action.OPEN_SHORT.value,
-        "close_long": Action.CLOSE_LONG.value,
-        "exit_long": Action.CLOSE_LONG.value,
-        "close_short": Action.CLOSE_SHORT.value,
-        "exit_short": Action.CLOSE_SHORT.value,
-        "wait": Action.WAIT.value,
-        "skip": Action.WAIT.value,
-        "hold": Action.HOLD.value,
-    }
-    if raw in mapping:
-        return mapping[raw]
+    return _normalize_action_cached(
+        str(action or "").strip().lower(),
+        str(position_side or "").strip().lower(),
+    )
+
+
+@lru_cache(maxsize=128)
+def _normalize_action_cached(raw: str, side: str) -> str:
+    # Keyed on the cleaned strings, so the cache stays small and any input type is accepted.
+    if raw in _ACTION_ALIASES:
+        return _ACTION_ALIASES[raw]
 
     if raw in {"close", "exit", "close_position"}:
         if side in {"long", "open_long"}:
@@ -0,0 +1,15 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient (and app lifespan) for the whole session."""
+    from fastapi.testclient import TestClient
+    from src.server.app import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -2,10 +2,6 @@
 Unit tests for trading action protocol normalization.
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from src.utils.action_protocol import (
     normalize_action,
     is_open_action,
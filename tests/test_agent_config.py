@@ -2,10 +2,6 @@
 Unit tests for Agent Configuration Module
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 import pytest
 from src.agents.agent_config import AgentConfig
 
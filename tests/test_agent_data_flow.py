@@ -3,10 +3,6 @@ Integration tests for Multi-Agent Data Flow
 Validates proper data format and structure across agents.
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 import asyncio
 import pandas as pd
 import numpy as np
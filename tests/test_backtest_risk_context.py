@@ -3,16 +3,12 @@ Tests for backtest risk context parity with live pipeline.
 """
 
 import asyncio
-import os
-import sys
 from datetime import datetime, timedelta
 from types import SimpleNamespace
 
 import numpy as np
 import pandas as pd
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 from src.agents.data_sync_agent import MarketSnapshot
 from src.backtest.agent_wrapper import BacktestAgentRunner
 from src.backtest.engine import BacktestConfig, BacktestEngine
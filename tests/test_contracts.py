@@ -2,10 +2,6 @@
 Unit tests for analysis->execution contracts.
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from src.agents.contracts import SuggestedTrade
 
 
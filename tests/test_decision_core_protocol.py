@@ -2,11 +2,6 @@
 Unit tests for DecisionCore action protocol behavior.
 """
 
-import os
-import sys
-
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 from src.agents.decision_core_agent import DecisionCoreAgent, OvertradingGuard, VoteResult
 
 
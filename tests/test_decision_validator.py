@@ -2,11 +2,6 @@
 Unit tests for decision validator action normalization contract.
 """
 
-import os
-import sys
-
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 from src.strategy.decision_validator import DecisionValidator
 
 
@@ -2,10 +2,7 @@
 Unit tests for ExecutionEngine action protocol compatibility.
 """
 
-import os
-import sys
-
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import asyncio
 
 from src.execution.engine import ExecutionEngine
 
@@ -13,8 +10,12 @@ from src.execution.engine import ExecutionEngine
 class _DummyClient:
     def __init__(self):
         self.orders = []
+        self.cancel_calls = 0
+        self.batch_calls = 0
+        self.rejected_types = set()
 
     def cancel_all_orders(self, symbol):
+        self.cancel_calls += 1
         return True
 
     def place_market_order(self, symbol, side, quantity, reduce_only=False, position_side=None):
@@ -30,53 +31,197 @@ class _DummyClient:
         return {"symbol": symbol, "side": side, "qty": quantity}
 
 
+    def place_sl_tp_batch_order(self, symbol, side, stop_loss_price=None, take_profit_price=None, position_side="LONG"):
+        self.batch_calls += 1
+        results = []
+        for order_type, price in (("STOP_MARKET", stop_loss_price), ("TAKE_PROFIT_MARKET", take_profit_price)):
+            if not price:
+                continue
+            if order_type in self.rejected_types:
+                results.append({"code": -2021, "msg": "Order would immediately trigger."})
+                continue
+            self.orders.append({"type": order_type, "side": side, "stop_price": price})
+            results.append({"orderId": len(self.orders), "type": order_type, "stopPrice": str(price)})
+        return results
+
+
+class _DummyLeverageApi:
+    def futures_change_leverage(self, symbol, leverage):
+        return {"symbol": symbol, "leverage": leverage}
+
+
 class _DummyRisk:
     pass
 
 
+class _DummyOpenRisk:
+    def calculate_position_size(self, account_balance, position_pct, leverage, current_price):
+        return 0.01
+
+    def calculate_stop_loss_price(self, entry_price, stop_loss_pct, side):
+        return entry_price * (1 - stop_loss_pct / 100) if side == "LONG" else entry_price * (1 + stop_loss_pct / 100)
+
+    def calculate_take_profit_price(self, entry_price, take_profit_pct, side):
+        return entry_price * (1 + take_profit_pct / 100) if side == "LONG" else entry_price * (1 - take_profit_pct / 100)
+
+
 def test_close_position_normalizes_to_directional_close():
     engine = ExecutionEngine(_DummyClient(), _DummyRisk())
-    result = engine.execute_decision(
+    result = asyncio.run(engine.execute_decision(
         decision={"symbol": "BTCUSDT", "action": "close_position"},
         account_info={},
         position_info={"position_amt": -0.2},
         current_price=100.0,
-    )
+    ))
     assert result["success"] is True
     assert result["action"] == "close_short"
 
 
+def test_repeat_close_skips_cancel_until_new_orders_are_placed():
+    client = _DummyClient()
+    engine = ExecutionEngine(client, _DummyRisk())
+
+    async def close_twice():
+        for _ in range(2):
+            await engine.execute_decision(
+                decision={"symbol": "BTCUSDT", "action": "close_position"},
+                account_info={},
+                position_info={"position_amt": 0.2},
+                current_price=100.0,
+            )
+
+    asyncio.run(close_twice())
+    assert client.cancel_calls == 1
+
+    client.set_stop_loss_take_profit = lambda **kwargs: []
+    engine.set_stop_loss_take_profit("BTCUSDT", "LONG", stop_loss=90.0)
+    asyncio.run(close_twice())
+    assert client.cancel_calls == 2
+
+
+def test_close_cancels_resting_orders_before_closing():
+    client = _DummyClient()
+    calls = []
+    cancel = client.cancel_all_orders
+    place = client.place_market_order
+    client.cancel_all_orders = lambda symbol: calls.append("cancel") or cancel(symbol)
+    client.place_market_order = lambda **kwargs: calls.append("close") or place(**kwargs)
+    engine = ExecutionEngine(client, _DummyRisk())
+    asyncio.run(engine.execute_decision(
+        decision={"symbol": "BTCUSDT", "action": "close_position"},
+        account_info={},
+        position_info={"position_amt": 0.2},
+        current_price=100.0,
+    ))
+    assert calls == ["cancel", "close"]
+
+
 def test_directional_close_mismatch_is_blocked():
     engine = ExecutionEngine(_DummyClient(), _DummyRisk())
-    result = engine.execute_decision(
+    result = asyncio.run(engine.execute_decision(
         decision={"symbol": "BTCUSDT", "action": "close_long"},
         account_info={},
         position_info={"position_amt": -0.2},
         current_price=100.0,
-    )
+    ))
     assert result["success"] is False
     assert result["action"] == "close_long"
 
 
 def test_wait_action_is_noop_success():
     engine = ExecutionEngine(_DummyClient(), _DummyRisk())
-    result = engine.execute_decision(
+    result = asyncio.run(engine.execute_decision(
         decision={"symbol": "ETHUSDT", "action": "wait"},
         account_info={},
         position_info=None,
         current_price=200.0,
-    )
+    ))
     assert result["success"] is True
     assert result["message"] == "观望，不执行操作"
 
 
 def test_legacy_add_position_still_routed_for_compatibility():
     engine = ExecutionEngine(_DummyClient(), _DummyRisk())
-    result = engine.execute_decision(
+    result = asyncio.run(engine.execute_decision(
         decision={"symbol": "ETHUSDT", "action": "add_position"},
         account_info={},
         position_info=None,
         current_price=200.0,
-    )
+    ))
     assert result["success"] is False
     assert result["action"] == "add_position"
+
+
+def test_open_short_places_sl_and_tp_on_closing_side():
+    client = _DummyClient()
+    client.client = _DummyLeverageApi()
+    engine = ExecutionEngine(client, _DummyOpenRisk())
+    result = asyncio.run(engine.execute_decision(
+        decision={
+            "symbol": "BTCUSDT",
+            "action": "open_short",
+            "leverage": 2,
+            "position_size_pct": 10,
+            "stop_loss_pct": 1.0,
+            "take_profit_pct": 2.0,
+        },
+        account_info={"available_balance": 1000.0},
+        position_info=None,
+        current_price=100.0,
+    ))
+    assert result["success"] is True
+    assert len(result["orders"]) == 3
+    sl_tp = [o for o in client.orders if o.get("type")]
+    assert {o["type"] for o in sl_tp} == {"STOP_MARKET", "TAKE_PROFIT_MARKET"}
+    assert all(o["side"] == "BUY" for o in sl_tp)
+    assert client.batch_calls == 1
+
+
+def test_add_position_on_long_opens_long_side():
+    client = _DummyClient()
+    client.client = _DummyLeverageApi()
+    engine = ExecutionEngine(client, _DummyOpenRisk())
+    result = asyncio.run(engine.execute_decision(
+        decision={
+            "symbol": "BTCUSDT",
+            "action": "add_position",
+            "leverage": 2,
+            "position_size_pct": 10,
+            "stop_loss_pct": 1.0,
+            "take_profit_pct": 2.0,
+        },
+        account_info={"available_balance": 1000.0},
+        position_info={"position_amt": 0.2},
+        current_price=100.0,
+    ))
+    assert result["success"] is True
+    assert result["action"] == "open_long"
+    assert client.orders[0]["side"] == "BUY"
+    assert client.orders[0]["position_side"] == "LONG"
+    assert all(o["side"] == "SELL" for o in client.orders if o.get("type"))
+
+
+def test_open_reports_failure_when_stop_loss_is_rejected():
+    client = _DummyClient()
+    client.client = _DummyLeverageApi()
+
+    client.rejected_types = {"STOP_MARKET"}
+    engine = ExecutionEngine(client, _DummyOpenRisk())
+    result = asyncio.run(engine.execute_decision(
+        decision={
+            "symbol": "BTCUSDT",
+            "action": "open_long",
+            "leverage": 2,
+            "position_size_pct": 10,
+            "stop_loss_pct": 1.0,
+            "take_profit_pct": 2.0,
+        },
+        account_info={"available_balance": 1000.0},
+        position_info=None,
+        current_price=100.0,
+    ))
+    assert result["success"] is False
+    assert result["sl_tp_failed"] is True
+    assert result["stop_loss"] is None
+    assert result["take_profit"] == 102.0
+    assert [o.get("type") for o in client.orders] == [None, "TAKE_PROFIT_MARKET"]
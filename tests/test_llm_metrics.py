@@ -0,0 +1,81 @@
+"""
+Unit tests for LLM runtime metrics aggregation.
+"""
+
+import threading
+
+import pytest
+
+from src.llm import metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics._pending.clear()
+    metrics._stats_by_provider.clear()
+    metrics._stats_by_model.clear()
+    yield
+    metrics._stats_by_provider.clear()
+    metrics._stats_by_model.clear()
+
+
+def test_success_updates_provider_and_model():
+    metrics.record_request("glm", "glm-4-flash")
+    metrics.record_success(
+        "glm", "glm-4-flash", 200,
+        {"prompt_tokens": 30, "completion_tokens": 10},
+    )
+
+    snap = metrics.snapshot()
+    for stat in (snap["providers"]["glm"], snap["models"]["glm-4-flash"]):
+        assert stat["total_requests"] == 1
+        assert stat["total_success"] == 1
+        assert stat["total_tokens"] == 40
+        assert stat["avg_latency_ms"] == 200
+        assert stat["token_speed_tps"] == 200.0
+
+
+def test_error_records_last_error():
+    metrics.record_request("kimi", "moonshot-v1-8k")
+    metrics.record_error("kimi", "moonshot-v1-8k", "HTTP 429")
+
+    stat = metrics.snapshot()["providers"]["kimi"]
+    assert stat["total_errors"] == 1
+    assert stat["last_error"] == "HTTP 429"
+
+
+def test_concurrent_providers_keep_exact_counts():
+    providers = [("glm", "glm-4-flash"), ("kimi", "moonshot-v1-8k"), ("minimax", "MiniMax-M2.1")]
+    per_thread = 200
+
+    def worker(provider, model):
+        for _ in range(per_thread):
+            metrics.record_request(provider, model)
+            metrics.record_success(provider, model, 10, {"total_tokens": 5})
+
+    threads = [
+        threading.Thread(target=worker, args=pair)
+        for pair in providers
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    snap = metrics.snapshot()
+    for provider, model in providers:
+        assert snap["providers"][provider]["total_requests"] == 4 * per_thread
+        assert snap["providers"][provider]["total_success"] == 4 * per_thread
+        assert snap["models"][model]["total_tokens"] == 4 * per_thread * 5
+
+
+def test_events_are_queued_until_drained():
+    metrics.record_request("minimax", "MiniMax-M2.1")
+    metrics.record_success("minimax", "MiniMax-M2.1", 50, {"total_tokens": 7})
+    assert "minimax" not in metrics._stats_by_provider
+
+    assert metrics.drain() == 2
+    stat = metrics._stats_by_provider["minimax"]
+    assert stat.total_requests == 1
+    assert stat.total_tokens == 7
@@ -0,0 +1,103 @@
+"""
+Unit tests for BaseLLMClient transport behaviour: retries, timeouts, streaming (mocked transport).
+"""
+
+import json
+
+import httpx
+import pytest
+
+from src.llm import base
+from src.llm import LLMConfig, DeepSeekClient
+
+
+_OK_BODY = {
+    "model": "deepseek-chat",
+    "choices": [{"message": {"role": "assistant", "content": "ok"}}],
+    "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+}
+
+
+def _client(responses, max_retries=3):
+    calls = iter(responses)
+    client = DeepSeekClient(LLMConfig(api_key="sk-test", max_retries=max_retries))
+    client.client = httpx.Client(transport=httpx.MockTransport(lambda request: next(calls)))
+    return client
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(base.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_rate_limit_honors_retry_after(sleeps):
+    client = _client([
+        httpx.Response(429, headers={"retry-after": "2"}),
+        httpx.Response(200, json=_OK_BODY),
+    ])
+    response = client.chat(system_prompt="s", user_prompt="u")
+    assert response.content == "ok"
+    assert sleeps == [2.0]
+
+
+def test_backoff_is_capped_and_no_sleep_after_last_attempt(sleeps):
+    client = _client([httpx.Response(503)] * 3)
+    with pytest.raises(httpx.HTTPStatusError):
+        client.chat(system_prompt="s", user_prompt="u")
+    assert len(sleeps) == 2
+    assert all(0 < s <= base.RETRY_BACKOFF_MAX * 1.5 for s in sleeps)
+
+
+def test_client_uses_short_connect_timeout_and_configured_read_timeout():
+    client = DeepSeekClient(LLMConfig(api_key="sk-test", timeout=30))
+    assert client.client.timeout.connect == base.HTTP_CONNECT_TIMEOUT
+    assert client.client.timeout.read == 30
+    client.close()
+
+
+_STREAM_DELTAS = ["<reasoning>ok</reasoning>\n<deci", "sion>{\"action\": \"wait\"}</dec", "ision>", " trailing", " tokens"]
+
+
+class _SSEStream(httpx.SyncByteStream):
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+
+    def __iter__(self):
+        for delta in _STREAM_DELTAS:
+            self.sent.append(delta)
+            event = {"choices": [{"delta": {"content": delta}}]}
+            yield f"data: {json.dumps(event)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    def close(self):
+        self.closed = True
+
+
+def _streaming_client(http_version):
+    stream = _SSEStream()
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, stream=stream, extensions={"http_version": http_version})
+
+    client = DeepSeekClient(LLMConfig(api_key="sk-test"))
+    client.client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client, stream, requests
+
+
+@pytest.mark.parametrize("http_version", [b"HTTP/2", b"HTTP/1.1"])
+def test_stream_returns_at_marker_and_closes_stream(sleeps, http_version):
+    client, stream, requests = _streaming_client(http_version)
+    response = client.chat(system_prompt="s", user_prompt="u", stop_after="</decision>")
+
+    assert requests[0]["stream"] is True
+    assert response.content.endswith("</decision>")
+    assert "trailing" not in response.content
+    assert response.usage["completion_tokens"] > 0
+    # Both protocols close at the marker instead of reading the remainder
+    assert stream.closed
+    assert len(stream.sent) == 3
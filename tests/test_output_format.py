@@ -4,7 +4,6 @@ Test script for LLM output parser and decision validator
 """
 
 import sys
-sys.path.insert(0, '/Users/yunxuanhan/Documents/workspace/ai/LLM-TradeBot')
 
 from src.strategy.llm_parser import LLMOutputParser
 from src.strategy.decision_validator import DecisionValidator
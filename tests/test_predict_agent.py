@@ -2,10 +2,6 @@
 Tests for PredictAgent
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 import pytest
 import asyncio
 import numpy as np
@@ -3,10 +3,6 @@ Unit tests for RiskAuditAgent hard veto and conflict gates.
 """
 
 import asyncio
-import os
-import sys
-
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.agents.risk_audit_agent import RiskAuditAgent
 
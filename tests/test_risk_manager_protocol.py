@@ -2,11 +2,6 @@
 Unit tests for RiskManager action protocol behavior.
 """
 
-import os
-import sys
-
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 from src.risk.manager import RiskManager
 
 
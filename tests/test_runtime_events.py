@@ -1,9 +1,5 @@
-import os
-import sys
 import time
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from src.agents.runtime_events import emit_runtime_event
 
 
@@ -0,0 +1,94 @@
+"""
+Unit tests for dashboard server helpers and response handling.
+"""
+
+from collections import deque
+from unittest.mock import patch
+
+import orjson
+import pytest
+from src.server.app import app, dump_json, verify_auth
+
+
+@pytest.fixture(autouse=True)
+def _bypass_auth():
+    app.dependency_overrides[verify_auth] = lambda: True
+    yield
+    app.dependency_overrides.pop(verify_auth, None)
+
+
+def test_dump_json_lists_state_containers_and_rejects_unknown_types():
+    payload = orjson.loads(dump_json({"logs": deque(["a", "b"]), "symbols": {"BTCUSDT"}}))
+    assert payload == {"logs": ["a", "b"], "symbols": ["BTCUSDT"]}
+
+    with pytest.raises(TypeError):
+        dump_json({"obj": object()})
+
+
+@pytest.fixture
+def status_state(monkeypatch):
+    """Start each /api/status test from an empty cache and a known state version."""
+    from src.server import app as app_module
+    from src.server.state import global_state
+
+    monkeypatch.setitem(app_module._status_cache, "payload", None)
+    monkeypatch.setattr(global_state, "last_update", "10:00:00")
+    monkeypatch.setattr(global_state, "current_price", 100.0)
+    return app_module, global_state
+
+
+def test_status_reuses_cached_bytes_until_state_version_changes(client, monkeypatch, status_state):
+    app_module, global_state = status_state
+    monkeypatch.setattr(app_module, "STATUS_CACHE_TTL_SEC", 60.0)
+
+    first = client.get("/api/status").content
+    monkeypatch.setattr(global_state, "current_price", 101.0)
+    assert client.get("/api/status").content == first
+
+    monkeypatch.setattr(global_state, "last_update", "10:00:01")
+    rebuilt = client.get("/api/status").content
+    assert rebuilt != first
+    assert orjson.loads(rebuilt)["market"]["price"] == 101.0
+
+
+def test_status_rebuilds_after_cache_ttl(client, monkeypatch, status_state):
+    app_module, global_state = status_state
+    monkeypatch.setattr(app_module, "STATUS_CACHE_TTL_SEC", 0.0)
+
+    client.get("/api/status")
+    monkeypatch.setattr(global_state, "current_price", 101.0)
+    assert orjson.loads(client.get("/api/status").content)["market"]["price"] == 101.0
+
+
+def test_gzip_compresses_status_but_not_backtest_stream(client, status_state):
+    headers = {"Accept-Encoding": "gzip"}
+
+    status = client.get("/api/status", headers=headers)
+    assert len(status.content) >= 1024
+    assert status.headers["content-encoding"] == "gzip"
+
+    class FakeBacktestEngine:
+        def __init__(self, config):
+            self.config = config
+
+        async def run(self, progress_callback=None):
+            # One progress line well above the gzip minimum_size, then stop
+            await progress_callback({"progress": 50, "metrics": {"pad": "x" * 4096}})
+            raise RuntimeError("stop after first chunk")
+
+    request = {"symbol": "BTCUSDT", "start_date": "2024-01-01", "end_date": "2024-01-02"}
+    with patch("src.backtest.engine.BacktestEngine", FakeBacktestEngine):
+        with client.stream("POST", "/api/backtest/run", json=request, headers=headers) as response:
+            assert "content-encoding" not in response.headers
+            lines = [orjson.loads(line) for line in response.iter_lines() if line]
+    assert lines[0]["type"] == "progress"
+    assert lines[-1]["type"] == "error"
+
+
+def test_static_assets_cache_immutable_only_when_versioned(client):
+    versioned = client.get("/static/app.js?v=123")
+    assert versioned.status_code == 200
+    assert versioned.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+    unversioned = client.get("/static/app.js")
+    assert unversioned.headers["cache-control"] == "no-cache"
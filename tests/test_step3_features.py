@@ -1,8 +1,3 @@
-import sys
-import os
-# ensure project root in path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 import pandas as pd
 import numpy as np
 import pytest
@@ -0,0 +1,246 @@
+"""
+Unit tests for StrategyEngine decision plumbing (no network).
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.strategy import llm_engine
+from src.strategy.llm_engine import StrategyEngine
+
+
+class _Response:
+    content = "no decision here"
+
+
+class _ScriptedClient:
+    def __init__(self, content=_Response.content):
+        self.content = content
+        self.calls = []
+
+    def chat(self, **kwargs):
+        self.calls.append(kwargs)
+        reply = _Response()
+        reply.content = self.content
+        return reply
+
+
+class _SlowClient:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def chat(self, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return _Response()
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setenv("LLM_DISABLED", "1")
+    return StrategyEngine()
+
+
+@pytest.fixture
+def ready_engine(engine):
+    """Attach a stub LLM client and mark the engine ready."""
+    def attach(client):
+        engine.disable_llm = False
+        engine.is_ready = True
+        engine.client = client
+        return engine
+    return attach
+
+
+# Passing explicit perspectives keeps make_decision from fetching them via the client
+_NEUTRAL = {"stance": "NEUTRAL"}
+
+
+def _context(symbol):
+    return {"symbol": symbol, "timestamp": "2026-01-01T00:00:00"}
+
+
+def test_disabled_engine_returns_fallback_per_symbol(engine):
+    async def run():
+        return await asyncio.gather(
+            *(engine.make_decision_async("ctx", _context(s)) for s in ("BTCUSDT", "ETHUSDT"))
+        )
+
+    results = asyncio.run(run())
+    assert [r["symbol"] for r in results] == ["BTCUSDT", "ETHUSDT"]
+    assert all(r["is_fallback"] and r["action"] == "wait" for r in results)
+
+
+def test_concurrent_decisions_are_bounded(ready_engine, monkeypatch):
+    monkeypatch.setattr(StrategyEngine, "_decision_slots", threading.BoundedSemaphore(2))
+    client = _SlowClient()
+    engine = ready_engine(client)
+
+    async def run():
+        return await asyncio.gather(*(
+            engine.make_decision_async(
+                "ctx", _context(f"SYM{i}USDT"),
+                bull_perspective=_NEUTRAL, bear_perspective=_NEUTRAL,
+            )
+            for i in range(llm_engine.MAX_CONCURRENT_DECISIONS + 2)
+        ))
+
+    results = asyncio.run(run())
+    assert len(results) == llm_engine.MAX_CONCURRENT_DECISIONS + 2
+    assert client.peak == 2
+
+
+def test_system_prompt_is_cached_until_custom_file_changes(engine, monkeypatch, tmp_path):
+    prompt_file = tmp_path / "custom_prompt.md"
+    monkeypatch.setattr(llm_engine, "_CUSTOM_PROMPT_PATH", str(prompt_file))
+    monkeypatch.setattr(llm_engine, "_system_prompt_cache", {"key": False, "prompt": None})
+
+    default_prompt = engine._build_system_prompt()
+    assert engine._build_system_prompt() is default_prompt
+
+    prompt_file.write_text("custom rules v1", encoding="utf-8")
+    first = engine._build_system_prompt()
+    assert first == "custom rules v1"
+    assert engine._build_system_prompt() is first
+
+    prompt_file.write_text("custom rules v2 (longer)", encoding="utf-8")
+    assert engine._build_system_prompt() == "custom rules v2 (longer)"
+
+
+def _valid_decision(**overrides):
+    decision = {
+        "action": "open_long",
+        "symbol": "BTCUSDT",
+        "confidence": 80,
+        "leverage": 2,
+        "position_size_pct": 10,
+        "stop_loss_pct": 1.0,
+        "take_profit_pct": 2.0,
+        "reasoning": "strong trend continuation",
+    }
+    decision.update(overrides)
+    return decision
+
+
+def test_validate_decision_rejects_missing_fields(engine):
+    decision = _valid_decision()
+    del decision["leverage"]
+    del decision["reasoning"]
+    assert engine.validate_decision(decision) is False
+
+
+def test_validate_decision_downgrades_low_confidence_open(engine):
+    decision = _valid_decision(confidence=50, reasoning="range bound")
+    assert engine.validate_decision(decision) is True
+    assert decision["action"] == "wait"
+    assert engine.validate_decision(_valid_decision(action="teleport")) is False
+
+
+def test_auth_error_disables_llm_and_falls_back(ready_engine):
+    import httpx
+
+    class _RejectingClient:
+        closed = False
+
+        def chat(self, **kwargs):
+            request = httpx.Request("POST", "https://llm.example/chat/completions")
+            raise httpx.HTTPStatusError("unauthorized", request=request, response=httpx.Response(401, request=request))
+
+        def close(self):
+            self.closed = True
+
+    client = _RejectingClient()
+    engine = ready_engine(client)
+
+    result = engine.make_decision(
+        "ctx", _context("BTCUSDT"), bull_perspective=_NEUTRAL, bear_perspective=_NEUTRAL
+    )
+    assert result["is_fallback"] is True
+    assert engine.disable_llm is True
+    assert engine.client is None and client.closed
+
+
+def test_successful_decision_carries_metadata(ready_engine):
+    client = _ScriptedClient(
+        "<reasoning>range bound</reasoning>\n"
+        '<decision>\n```json\n[{"symbol": "ETHUSDT", "action": "wait", "reasoning": "no edge"}]\n```\n</decision>'
+    )
+    engine = ready_engine(client)
+
+    decision = engine.make_decision(
+        "ctx", _context("ETHUSDT"), bull_perspective=_NEUTRAL, bear_perspective=_NEUTRAL
+    )
+    assert decision["action"] == "wait"
+    assert decision["validation_passed"] is True
+    assert decision["timestamp"] == "2026-01-01T00:00:00"
+    assert decision["raw_response"] == client.content
+    assert decision["bull_perspective"] is _NEUTRAL
+    assert "user_prompt" in decision and "system_prompt" in decision
+
+
+def test_fallback_decisions_do_not_share_state(engine):
+    first = engine._get_fallback_decision({"symbol": "SOLUSDT", "timestamp": "t1"})
+    first["action"] = "open_long"
+    second = engine._get_fallback_decision({})
+    assert second["action"] == "wait"
+    assert second["symbol"] == "BTCUSDT" and second["timestamp"] is None
+    assert first["symbol"] == "SOLUSDT" and first["timestamp"] == "t1"
+
+
+def test_batch_decisions_map_back_to_input_order(ready_engine):
+    client = _ScriptedClient(
+        "<reasoning>batch</reasoning>\n<decision>\n```json\n["
+        '{"symbol": "ETHUSDT", "action": "wait", "reasoning": "eth flat"},'
+        '{"symbol": "BTCUSDT", "action": "hold", "reasoning": "btc flat"}'
+        "]\n```\n</decision>"
+    )
+    engine = ready_engine(client)
+    engine.max_tokens = 1000
+
+    contexts = [(f"{s} data", _context(s)) for s in ("BTCUSDT", "ETHUSDT", "SOLUSDT")]
+    decisions = engine.make_decisions_batch(contexts)
+
+    assert len(client.calls) == 1
+    call = client.calls[0]
+    assert call["max_tokens"] == 3000
+    assert "## Symbol 3: SOLUSDT" in call["user_prompt"]
+    assert call["system_prompt"] == engine._build_system_prompt()
+
+    assert [d["symbol"] for d in decisions] == ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+    assert decisions[0]["reasoning"] == "btc flat" and decisions[0]["batch_size"] == 3
+    assert decisions[1]["reasoning"] == "eth flat"
+    assert decisions[2]["is_fallback"] is True
+
+
+def test_batch_size_is_bounded_by_output_budget(ready_engine):
+    client = _ScriptedClient("<decision>[]</decision>")
+    engine = ready_engine(client)
+    engine.max_tokens = llm_engine.BATCH_MAX_OUTPUT_TOKENS // 2
+
+    contexts = [(f"ctx {i}", _context(f"SYM{i}USDT")) for i in range(4)]
+    decisions = engine.make_decisions_batch(contexts)
+
+    assert len(client.calls) == 2
+    assert all(d["is_fallback"] for d in decisions)
+
+
+def test_trailing_single_symbol_chunk_uses_one_request(ready_engine):
+    client = _ScriptedClient("<decision>[]</decision>")
+    engine = ready_engine(client)
+    engine.max_tokens = 1000
+
+    contexts = [(f"ctx {i}", _context(f"SYM{i}USDT")) for i in range(llm_engine.MAX_BATCH_SYMBOLS + 1)]
+    decisions = engine.make_decisions_batch(contexts)
+
+    assert len(client.calls) == 2
+    assert "## Symbol 1: SYM5USDT" in client.calls[1]["user_prompt"]
+    assert not any("bull_perspective" in d for d in decisions)
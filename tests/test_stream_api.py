@@ -1,13 +1,20 @@
-import json
 from datetime import datetime, timezone
 
+import orjson
 import pandas as pd
-from fastapi.testclient import TestClient
-from src.server.app import app
+import pytest
+from src.server.app import app, verify_auth
 from unittest.mock import patch
 
 
-def test_backtest_stream_endpoint():
+@pytest.fixture(autouse=True)
+def _bypass_auth():
+    app.dependency_overrides[verify_auth] = lambda: True
+    yield
+    app.dependency_overrides.pop(verify_auth, None)
+
+
+def test_backtest_stream_endpoint(client):
     print("🧪 Testing Backtest Streaming Endpoint...")
 
     mock_request = {
@@ -80,50 +87,40 @@ def test_backtest_stream_endpoint():
         def save_backtest(self, **kwargs):
             return 1
 
-    client = TestClient(app)
-    from src.server.app import verify_auth
-    app.dependency_overrides[verify_auth] = lambda: True
+    with patch("src.backtest.engine.BacktestEngine", FakeBacktestEngine), patch(
+        "src.backtest.storage.BacktestStorage", FakeBacktestStorage
+    ):
+        print("🚀 Sending request...")
+        with client.stream("POST", "/api/backtest/run", json=mock_request) as response:
+            print(f"📡 Status Code: {response.status_code}")
+            assert response.status_code == 200
+
+            progress_count = 0
+            has_result = False
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+
+                data = orjson.loads(line)
+                print(f"📦 Received Chunk: {data.get('type')}")
+
+                if data["type"] == "progress":
+                    progress_count += 1
+                    assert "percent" in data
+                elif data["type"] == "result":
+                    has_result = True
+                    assert "metrics" in data["data"]
+                    if "id" in data["data"]:
+                        print(f"✅ Received Backtest ID: #{data['data']['id']}")
+                elif data["type"] == "error":
+                    raise AssertionError(f"Unexpected error: {data['message']}")
+
+            print(f"✅ Received {progress_count} progress updates")
+            print(f"✅ Received Final Result: {has_result}")
+            assert has_result
+            assert progress_count >= 1
 
-    try:
-        with patch("src.backtest.engine.BacktestEngine", FakeBacktestEngine), patch(
-            "src.backtest.storage.BacktestStorage", FakeBacktestStorage
-        ):
-            print("🚀 Sending request...")
-            with client.stream("POST", "/api/backtest/run", json=mock_request) as response:
-                print(f"📡 Status Code: {response.status_code}")
-                assert response.status_code == 200
-
-                progress_count = 0
-                has_result = False
-
-                for line in response.iter_lines():
-                    if not line:
-                        continue
-
-                    data = json.loads(line)
-                    print(f"📦 Received Chunk: {data.get('type')}")
-
-                    if data["type"] == "progress":
-                        progress_count += 1
-                        assert "percent" in data
-                    elif data["type"] == "result":
-                        has_result = True
-                        assert "metrics" in data["data"]
-                        if "id" in data["data"]:
-                            print(f"✅ Received Backtest ID: #{data['data']['id']}")
-                    elif data["type"] == "error":
-                        raise AssertionError(f"Unexpected error: {data['message']}")
-
-                print(f"✅ Received {progress_count} progress updates")
-                print(f"✅ Received Final Result: {has_result}")
-                assert has_result
-                assert progress_count >= 1
-    finally:
-        app.dependency_overrides.pop(verify_auth, None)
 
 if __name__ == "__main__":
-    # Manually run the async test logic if not using pytest runner
-    # But TestClient is synchronous wrapper around ASGI.
-    # The stream() method returns a sync iterator.
-    
-    test_backtest_stream_endpoint()
+    raise SystemExit(pytest.main([__file__, "-s"]))
@@ -1,10 +1,6 @@
 import asyncio
-import os
-import sys
 from typing import Dict, List
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 from src.agents.symbol_selector_agent import SymbolSelectorAgent
 
 
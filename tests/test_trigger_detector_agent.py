@@ -1,10 +1,5 @@
-import os
-import sys
-
 import pandas as pd
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 from src.agents.trigger_detector_agent import TriggerDetector
 
 